@@ -78,6 +78,7 @@ a = Analysis(
         'tkinter',
         'pandas',
         'openpyxl',
+        'xlsxwriter',
         'numpy',
         'PIL',
         'cv2',
@@ -85,6 +86,7 @@ a = Analysis(
         'pyperclip',
         'keyboard',
         'cryptography',
+        'orjson',
         'requests',
         'docx',
         'ebooklib',
@@ -227,20 +227,20 @@ class BotController:
     def _process_successful_batch(self, batch, translations, existing_results):
         """Process successful translation results"""
         self.main_window.log_message(f"Successfully processed {len(translations)} translations")
-        for (idx, row), translation in zip(batch.iterrows(), translations):
-            existing_results[row['id']] = {
-                'id': row['id'],
-                'raw': row['text'],
+        for row_id, raw, translation in zip(batch['id'].tolist(), batch['text'].tolist(), translations):
+            existing_results[row_id] = {
+                'id': row_id,
+                'raw': raw,
                 'edit': translation,
                 'status': ''
             }
 
     def _mark_batch_as_failed(self, batch, existing_results, status='failed'):
         """Mark all items in batch as failed"""
-        for idx, row in batch.iterrows():
-            existing_results[row['id']] = {
-                'id': row['id'],
-                'raw': row['text'],
+        for row_id, raw in zip(batch['id'].tolist(), batch['text'].tolist()):
+            existing_results[row_id] = {
+                'id': row_id,
+                'raw': raw,
                 'edit': '',
                 'status': status
             }
@@ -279,14 +279,15 @@ class BotController:
             self.main_window.log_message(f"Saving results to: {output_path}")
 
             # Create results
-            results = []
-            for (idx, row), translation in zip(batch.iterrows(), translations):
-                results.append({
-                    'id': row['id'],
-                    'raw': row['text'],
+            results = [
+                {
+                    'id': row_id,
+                    'raw': raw,
                     'edit': translation,
                     'status': 'completed' if translation else 'failed'
-                })
+                }
+                for row_id, raw, translation in zip(batch['id'].tolist(), batch['text'].tolist(), translations)
+            ]
 
             # Save to CSV
             if results:
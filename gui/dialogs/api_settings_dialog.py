@@ -16,7 +16,7 @@ class APISettingsDialog:
         self.key_encryption = KeyEncryption()
 
         # Get current configuration
-        self.config = self.processing_tab.api_configs[service_name].copy()
+        self.config = self.processing_tab.get_api_config(service_name)
 
         # Store actual keys separately from display
         self.actual_keys = self.config.get('keys', []).copy()
@@ -258,13 +258,13 @@ class APISettingsDialog:
                     # Add valid keys
                     valid_keys = [k for k in keys if isinstance(k, str) and k.strip()]
 
-                    added_count = 0
-                    for key in valid_keys:
-                        if key not in self.actual_keys:
-                            self.actual_keys.append(key)
-                            masked_key = self.key_encryption.mask_key_for_display(key)
-                            self.keys_listbox.insert(tk.END, masked_key)
-                            added_count += 1
+                    # Skip keys already in the list (set lookup) and duplicates within the file
+                    existing = set(self.actual_keys)
+                    new_keys = [k for k in dict.fromkeys(valid_keys) if k not in existing]
+                    if new_keys:
+                        self.actual_keys.extend(new_keys)
+                        self.keys_listbox.insert(tk.END, *[self.key_encryption.mask_key_for_display(k) for k in new_keys])
+                    added_count = len(new_keys)
 
                     messagebox.showinfo("Success", f"Imported {added_count} API keys from Excel file\nKeys are encrypted and stored securely")
                 else:
@@ -292,7 +292,7 @@ class APISettingsDialog:
         self.config['keys'] = self.actual_keys.copy()
 
         # Update processing tab configuration
-        self.processing_tab.api_configs[self.service_name] = self.config.copy()
+        self.processing_tab.update_api_config(self.service_name, self.config)
 
         # Update selected model
         self.processing_tab.ai_model.set(self.model_var.get())
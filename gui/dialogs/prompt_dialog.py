@@ -98,7 +98,8 @@ class PromptDialog:
         try:
             prompt_file = "assets/translate_prompt.xlsx"
             if os.path.exists(prompt_file):
-                df = pd.read_excel(prompt_file)
+                from helper.prompt_helper import PromptHelper
+                df = PromptHelper.load_prompt_file(prompt_file)
                 prompt_type = self.processing_tab.prompt_type.get()
 
                 # Check if language column exists
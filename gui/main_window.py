@@ -451,6 +451,8 @@ class AITranslationBridgeGUI:
     def on_closing(self):
         """Handle window close event"""
         self.save_settings()
+        # Settings are written in background - make sure the last snapshot reaches disk
+        self.window_manager.flush_pending_writes()
 
         try:
             import keyboard
@@ -1,14 +1,63 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import pandas as pd
 import os
-import webbrowser
-from helper.prompt_helper import PromptHelper
-import pyperclip
+import threading
+from types import MappingProxyType
+from gui.window_manager import LazyKeys
 
 class ProcessingTab:
     """Processing settings tab"""
 
+    AI_SERVICES = ("Gemini", "ChatGPT", "Claude", "Perplexity", "Grok",
+                   "Gemini API", "ChatGPT API", "Claude API", "Grok API")
+
+    # Immutable API defaults shared by all instances; user changes are kept in _api_overrides
+    API_DEFAULTS = MappingProxyType({
+        'Gemini API': MappingProxyType({
+            'models': ('gemini-2.0-flash', 'gemini-2.5-flash-lite', 'gemini-2.5-flash', 'gemini-2.5-pro',
+                       'gemini-2.5-pro', 'gemini-3-flash-preview', 'gemini-3-pro-preview'),
+            'default_model': 'gemini-2.5-flash-lite',
+            'keys': (),
+            'max_tokens': 8192,
+            'temperature': 0.7,
+            'top_p': 0.95,
+            'top_k': 40,
+            'help_url': 'https://ai.google.dev/models/gemini'
+        }),
+        'ChatGPT API': MappingProxyType({
+            'models': ('gpt-4o-mini', 'gpt-4o', 'gpt-4.1', 'gpt-5-nano', 'gpt-5-mini', 'gpt-5', 'gpt-5.1',
+                       'gpt-5.2'),
+            'default_model': 'gpt-4o-mini',
+            'keys': (),
+            'max_tokens': 4096,
+            'temperature': 0.7,
+            'top_p': 0.95,
+            'top_k': 40,
+            'help_url': 'https://platform.openai.com/docs/models'
+        }),
+        'Claude API': MappingProxyType({
+            'models': ('claude-3-5-sonnet-20241022', 'claude-3-5-haiku-20241022', 'claude-3-opus-20240229',
+                       'claude-haiku-4-5-20251001','claude-sonnet-4-5-20250929','anthropic.claude-opus-4-5-20251101-v1:0'),
+            'default_model': 'claude-3-5-sonnet-20241022',
+            'keys': (),
+            'max_tokens': 4096,
+            'temperature': 0.7,
+            'top_p': 0.95,
+            'top_k': 40,
+            'help_url': 'https://platform.claude.com/docs/en/about-claude/models/overview'
+        }),
+        'Grok API': MappingProxyType({
+            'models': ('grok-3-mini', 'grok-4-fast-non-reasoning', 'grok-4-fast-reasoning','grok-4-1-fast-non-reasoning', 'grok-4-1-fast-reasoning'),
+            'default_model': 'grok-3-mini',
+            'keys': (),
+            'max_tokens': 4096,
+            'temperature': 0.7,
+            'top_p': 0.95,
+            'top_k': 40,
+            'help_url': 'https://docs.x.ai/docs/models'
+        })
+    })
+
     def __init__(self, parent, main_window):
         self.parent = parent
         self.main_window = main_window
@@ -27,7 +76,7 @@ class ProcessingTab:
 
     def init_variables(self):
         """Initialize tab variables"""
-        self.batch_size = tk.StringVar(value="10")
+        self.batch_size = tk.IntVar(value=10)
         self.prompt_type = tk.StringVar(value="")
         self.ai_service = tk.StringVar(value="Gemini")
         self.ai_model = tk.StringVar(value="")
@@ -35,61 +84,23 @@ class ProcessingTab:
 
         self.mode_var = tk.StringVar(value="automatic")
         self.current_prompt_text = ""
-        self.manual_batch_data = pd.DataFrame()  # Initialize as empty DataFrame instead of None
+        self.manual_batch_data = None  # Set when a prompt is copied; pandas is imported lazily
         self.manual_batch_ids = []
-        # API configuration
-        self.api_configs = {
-            'Gemini API': {
-                'models': ['gemini-2.0-flash', 'gemini-2.5-flash-lite', 'gemini-2.5-flash', 'gemini-2.5-pro',
-                           'gemini-2.5-pro', 'gemini-3-flash-preview', 'gemini-3-pro-preview'],
-                'default_model': 'gemini-2.5-flash-lite',
-                'keys': [],
-                'max_tokens': 8192,
-                'temperature': 0.7,
-                'top_p': 0.95,
-                'top_k': 40,
-                'help_url': 'https://ai.google.dev/models/gemini'
-            },
-            'ChatGPT API': {
-                'models': ['gpt-4o-mini', 'gpt-4o', 'gpt-4.1', 'gpt-5-nano', 'gpt-5-mini', 'gpt-5', 'gpt-5.1',
-                           'gpt-5.2'],
-                'default_model': 'gpt-4o-mini',
-                'keys': [],
-                'max_tokens': 4096,
-                'temperature': 0.7,
-                'top_p': 0.95,
-                'top_k': 40,
-                'help_url': 'https://platform.openai.com/docs/models'
-            },
-            'Claude API': {
-                'models': ['claude-3-5-sonnet-20241022', 'claude-3-5-haiku-20241022', 'claude-3-opus-20240229',
-                           'claude-haiku-4-5-20251001','claude-sonnet-4-5-20250929','anthropic.claude-opus-4-5-20251101-v1:0'],
-                'default_model': 'claude-3-5-sonnet-20241022',
-                'keys': [],
-                'max_tokens': 4096,
-                'temperature': 0.7,
-                'top_p': 0.95,
-                'top_k': 40,
-                'help_url': 'https://platform.claude.com/docs/en/about-claude/models/overview'
-            },
-            'Grok API': {
-                'models': ['grok-3-mini', 'grok-4-fast-non-reasoning', 'grok-4-fast-reasoning','grok-4-1-fast-non-reasoning', 'grok-4-1-fast-reasoning'],
-                'default_model': 'grok-3-mini',
-                'keys': [],
-                'max_tokens': 4096,
-                'temperature': 0.7,
-                'top_p': 0.95,
-                'top_k': 40,
-                'help_url': 'https://docs.x.ai/docs/models'
-            }
-        }
+        self.manual_batch_texts = []
+        # Compiled prompt renderers keyed by (prompt_type, template)
+        self._prompt_formatter_cache = {}
+        # Per-service API settings that differ from API_DEFAULTS
+        self._api_overrides = {}
+        # Output rows kept between pastes: ((path, mtime_ns, size), existing_results, max id)
+        self._saved_results = None
 
     def load_prompt_types(self):
         """Load prompt types from Excel file"""
         try:
             prompt_file = "assets/translate_prompt.xlsx"
             if os.path.exists(prompt_file):
-                df = pd.read_excel(prompt_file)
+                from helper.prompt_helper import PromptHelper
+                df = PromptHelper.load_prompt_file(prompt_file)
                 if 'type' in df.columns:
                     self.prompt_types = df['type'].unique().tolist()
                     if self.prompt_types:
@@ -143,12 +154,27 @@ class ProcessingTab:
 
         ttk.Label(batch_frame, text="Batch Size:").grid(row=0, column=0, sticky=tk.W, padx=(0, 10))
 
-        batch_entry = ttk.Entry(batch_frame, textvariable=self.batch_size, width=10)
+        # Reject non-numeric keystrokes so the variable always holds a valid integer (or is empty)
+        batch_entry = ttk.Entry(batch_frame, textvariable=self.batch_size, width=10,
+                                validate="key",
+                                validatecommand=(self.parent.register(self._is_nonneg_int), '%P'))
         batch_entry.grid(row=0, column=1, sticky=tk.W)
 
         ttk.Label(batch_frame, text="(Number of csv lines to process at once)",
                   font=("Arial", 9), foreground="gray").grid(row=0, column=2, sticky=tk.W, padx=(10, 0))
 
+    @staticmethod
+    def _is_nonneg_int(value):
+        """Entry validator allowing only digits (or an empty field while typing)"""
+        return value.isdigit() or value == ""
+
+    def get_batch_size(self):
+        """Get batch size as int, 0 when the field is empty"""
+        try:
+            return self.batch_size.get()
+        except tk.TclError:
+            return 0
+
     def create_prompt_section(self, parent, row):
         """Create prompt selection section"""
         prompt_frame = ttk.LabelFrame(parent, text="Prompt Configuration", padding="10")
@@ -200,11 +226,10 @@ class ProcessingTab:
         # Service selection
         ttk.Label(self.auto_frame, text="Select Service:").grid(row=0, column=0, sticky=tk.W, padx=(0, 10))
 
-        services = ["Gemini", "ChatGPT", "Claude", "Perplexity", "Grok", "Gemini API", "ChatGPT API", "Claude API", "Grok API"]
         self.ai_dropdown = ttk.Combobox(
             self.auto_frame,
             textvariable=self.ai_service,
-            values=services,
+            values=self.AI_SERVICES,
             state="readonly",
             width=15
         )
@@ -254,6 +279,11 @@ class ProcessingTab:
         self.manual_status_label = ttk.Label(self.manual_frame, text="", foreground="blue")
         self.manual_status_label.grid(row=1, column=0, columnspan=3, pady=(5, 0))
 
+        # Busy indicator shown while a pasted response is processed in background
+        self.manual_progress = ttk.Progressbar(self.manual_frame, mode="indeterminate")
+        self.manual_progress.grid(row=2, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(5, 0))
+        self.manual_progress.grid_remove()
+
         # Initially hide manual frame and setup based on current mode
         self.on_mode_change()
 
@@ -269,14 +299,14 @@ class ProcessingTab:
             self.model_frame.grid()
 
             # Load saved model or use default
-            if service in self.api_configs:
+            if service in self.API_DEFAULTS:
                 # Check if we have a saved model for this service
-                saved_model = self.api_configs[service].get('saved_model', '')
+                saved_model = self._api_overrides.get(service, {}).get('saved_model', '')
                 if saved_model:
                     self.ai_model.set(saved_model)
                 else:
                     # Use default model
-                    default_model = self.api_configs[service]['default_model']
+                    default_model = self.API_DEFAULTS[service]['default_model']
                     self.ai_model.set(default_model)
         else:
             self.model_frame.grid_remove()
@@ -285,7 +315,7 @@ class ProcessingTab:
     def open_api_settings(self):
         """Open API settings dialog"""
         service = self.ai_service.get()
-        if service in self.api_configs:
+        if service in self.API_DEFAULTS:
             from gui.dialogs.api_settings_dialog import APISettingsDialog
             APISettingsDialog(self.main_window, self, service)
         else:
@@ -294,8 +324,9 @@ class ProcessingTab:
     def open_api_help(self):
         """Open API documentation in browser"""
         service = self.ai_service.get()
-        if service in self.api_configs:
-            url = self.api_configs[service]['help_url']
+        if service in self.API_DEFAULTS:
+            url = self.API_DEFAULTS[service]['help_url']
+            import webbrowser
             webbrowser.open(url)
         else:
             messagebox.showinfo("Info", "Please select an API service first")
@@ -308,32 +339,60 @@ class ProcessingTab:
     def get_settings(self):
         """Get current tab settings"""
         settings = {
-            'batch_size': self.batch_size.get(),
+            'batch_size': self.get_batch_size(),
             'prompt_type': self.prompt_type.get(),
             'ai_service': self.ai_service.get(),
             'ai_model': self.ai_model.get(),
             'mode': self.mode_var.get()
         }
 
-        # Add API configurations and save current model
-        settings['api_configs'] = {}
-        for service, config in self.api_configs.items():
-            settings['api_configs'][service] = {
-                'keys': config['keys'],
-                'max_tokens': config['max_tokens'],
-                'temperature': config['temperature'],
-                'top_p': config['top_p'],
-                'top_k': config['top_k'],
-                'saved_model': self.ai_model.get() if service == self.ai_service.get() else config.get('saved_model', '')
-            }
+        # Add API configuration overrides (defaults are not persisted) and save current model
+        settings['api_configs'] = {service: dict(overrides) for service, overrides in self._api_overrides.items()}
+        service = self.ai_service.get()
+        if service in self.API_DEFAULTS and self.ai_model.get():
+            settings['api_configs'].setdefault(service, {})['saved_model'] = self.ai_model.get()
 
         return settings
 
+    def get_api_config(self, service):
+        """Get full API configuration for a service (defaults merged with overrides)"""
+        config = dict(self.API_DEFAULTS.get(service, {}))
+        config.update(self._api_overrides.get(service, {}))
+        config['keys'] = list(config.get('keys', []))
+        return config
+
+    def update_api_config(self, service, config):
+        """Merge configuration for a service, keeping only values that differ from defaults"""
+        defaults = self.API_DEFAULTS[service]
+        merged = self.get_api_config(service)
+        merged.update(config)
+
+        overrides = {}
+        for field, value in merged.items():
+            if field in ('models', 'default_model', 'help_url'):
+                continue  # Static fields always come from defaults
+            if field in ('keys', 'saved_model'):
+                if value:
+                    # LazyKeys from settings load stay encrypted until the service is used
+                    if field == 'keys' and not isinstance(value, LazyKeys):
+                        value = list(value)
+                    overrides[field] = value
+            elif defaults.get(field) != value:
+                overrides[field] = value
+
+        if overrides:
+            self._api_overrides[service] = overrides
+        else:
+            self._api_overrides.pop(service, None)
+
     def load_settings(self, settings):
         """Load settings into tab"""
         try:
             if 'batch_size' in settings:
-                self.batch_size.set(settings['batch_size'])
+                try:
+                    self.batch_size.set(int(settings['batch_size']))
+                except (TypeError, ValueError):
+                    pass
             if 'prompt_type' in settings:
                 self.prompt_type.set(settings['prompt_type'])
             if 'ai_service' in settings:
@@ -346,11 +405,8 @@ class ProcessingTab:
             # Load API configurations with saved models
             if 'api_configs' in settings:
                 for service, config in settings['api_configs'].items():
-                    if service in self.api_configs:
-                        self.api_configs[service].update(config)
-                        # Store saved model
-                        if 'saved_model' in config:
-                            self.api_configs[service]['saved_model'] = config['saved_model']
+                    if service in self.API_DEFAULTS:
+                        self.update_api_config(service, config)
 
             # Trigger service change handler to show/hide model config
             self.on_ai_service_change()
@@ -367,6 +423,7 @@ class ProcessingTab:
             self.current_prompt_text = ""
             self.manual_batch_data = None
             self.manual_batch_ids = []
+            self.manual_batch_texts = []
         else:  # manual
             self.auto_frame.grid_remove()
             self.manual_frame.grid()
@@ -375,206 +432,363 @@ class ProcessingTab:
 
     def copy_prompt_manual(self):
         """Copy prompt to clipboard for manual processing"""
-        try:
-            # Reset previous batch data
-            self.manual_batch_data = None
-            self.manual_batch_ids = []
+        # Reset previous batch data
+        self.manual_batch_data = None
+        self.manual_batch_ids = []
+        self.manual_batch_texts = []
 
-            # Get settings
-            translation_settings = self.main_window.translation_tab.get_settings()
-            input_file = translation_settings.get('input_file')
+        # Get settings
+        translation_settings = self.main_window.translation_tab.get_settings()
+        input_file = translation_settings.get('input_file')
 
-            if not input_file or not os.path.exists(input_file):
-                messagebox.showwarning("Warning", "Please select a valid input file first")
-                return
+        # Single stat serves as the existence check and as the CSV cache key
+        input_stat = None
+        if input_file:
+            try:
+                input_stat = os.stat(input_file)
+            except OSError:
+                pass
+        if input_stat is None:
+            messagebox.showwarning("Warning", "Please select a valid input file first")
+            return
+
+        prompt_type = self.prompt_type.get()
+        if not prompt_type:
+            messagebox.showwarning("Warning", "Please select a prompt type first")
+            return
+
+        # Batch size is already an integer thanks to the entry validator
+        batch_size = self.get_batch_size()
+        if batch_size <= 0:
+            messagebox.showwarning("Warning", "Invalid batch size: Batch size must be positive")
+            return
+
+        # Disable button while the batch is prepared in background
+        self.copy_prompt_btn.config(state="disabled")
+        self.manual_status_label.config(text="Preparing prompt...", foreground="blue")
+
+        thread = threading.Thread(
+            target=self._run_prepare_batch,
+            args=(input_file, input_stat, prompt_type, batch_size,
+                  translation_settings.get('start_id', ''),
+                  translation_settings.get('stop_id', '')),
+            daemon=True
+        )
+        thread.start()
 
-            # Import PromptHelper
-            from helper.prompt_helper import PromptHelper
+    def _run_prepare_batch(self, input_file, input_stat, prompt_type, batch_size, start_id, stop_id):
+        """Run batch preparation in background thread and hand result to main thread"""
+        try:
+            result = self._prepare_batch_worker(input_file, input_stat, prompt_type, batch_size, start_id, stop_id)
+        except Exception as e:
+            import traceback
+            self.main_window.root.after(0, self._on_batch_failed, str(e), traceback.format_exc())
+            return
 
-            # Load prompt using helper
-            prompt_type = self.prompt_type.get()
-            if not prompt_type:
-                messagebox.showwarning("Warning", "Please select a prompt type first")
-                return
+        if result is not None:
+            self.main_window.root.after(0, self._on_batch_ready, result)
 
-            prompt_template = PromptHelper.load_translation_prompt(
-                input_file,
-                prompt_type,
-                self.main_window.log_message
-            )
+    def _prepare_batch_worker(self, input_file, input_stat, prompt_type, batch_size, start_id, stop_id):
+        """Load prompt and input data, find next batch (background thread)
 
-            if not prompt_template:
-                messagebox.showwarning("Warning", "Failed to load translation prompt")
-                return
+        Returns (full_prompt, next_batch_df, batch_ids), or None after posting
+        a notice to the main thread.
+        """
+        import pandas as pd
+        from helper.prompt_helper import PromptHelper
 
-            # Read input CSV
-            try:
-                df = pd.read_csv(input_file)
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to read input file: {str(e)}")
-                return
-
-            # Check required columns
-            if 'id' not in df.columns or 'text' not in df.columns:
-                messagebox.showerror("Error", "Input file must have 'id' and 'text' columns")
-                return
-
-            # Apply filters
-            df = PromptHelper.apply_id_filters(
-                df,
-                translation_settings.get('start_id', ''),
-                translation_settings.get('stop_id', '')
-            )
-
-            if df.empty:
-                messagebox.showinfo("Info", "No data found after applying filters")
-                return
-
-            # Get batch size
+        prompt_template = PromptHelper.load_translation_prompt(
+            input_file,
+            prompt_type,
+            self.main_window.log_message
+        )
+
+        if not prompt_template:
+            self._post_batch_notice(messagebox.showwarning, "Warning", "Failed to load translation prompt")
+            return None
+
+        # Read input CSV (only 'id' and 'text' columns)
+        try:
+            df = PromptHelper.load_input_csv(input_file, input_stat)
+        except Exception as e:
+            # usecols also fails on a missing column; check the header so only that case
+            # gets the column message and other errors (e.g. decoding) keep their own text
             try:
-                batch_size = int(self.batch_size.get())
-                if batch_size <= 0:
-                    raise ValueError("Batch size must be positive")
-            except ValueError as e:
-                messagebox.showwarning("Warning", f"Invalid batch size: {e}")
-                return
+                columns = pd.read_csv(input_file, nrows=0).columns
+            except Exception:
+                columns = None
+            if columns is not None and not {'id', 'text'}.issubset(columns):
+                self._post_batch_notice(messagebox.showerror, "Error", "Input file must have 'id' and 'text' columns")
+            else:
+                self._post_batch_notice(messagebox.showerror, "Error", f"Failed to read input file: {str(e)}")
+            return None
+
+        # Apply filters
+        df = PromptHelper.apply_id_filters(df, start_id, stop_id)
+
+        if df.empty:
+            self._post_batch_notice(messagebox.showinfo, "Info", "No data found after applying filters")
+            return None
+
+        # Find next batch to process using helper
+        output_path = PromptHelper.generate_output_path(input_file, prompt_type)
+        next_batch_df = PromptHelper.find_next_batch(df, output_path, batch_size)
+
+        if next_batch_df is None or next_batch_df.empty:
+            self._post_batch_notice(messagebox.showinfo, "Info", "No more batches to process")
+            return None
+
+        # Create batch text using helper
+        batch_text = PromptHelper.create_batch_text(next_batch_df)
+
+        # Format prompt with renderer compiled once per prompt type/template
+        cache_key = (prompt_type, prompt_template)
+        render_prompt = self._prompt_formatter_cache.get(cache_key)
+        if render_prompt is None:
+            render_prompt = PromptHelper.compile_prompt_template(prompt_template)
+            self._prompt_formatter_cache[cache_key] = render_prompt
+
+        count_info = f"Source text consists of {len(next_batch_df)} numbered lines from 1 to {len(next_batch_df)}."
+        full_prompt = render_prompt(count_info=count_info, text=batch_text)
+
+        return full_prompt, next_batch_df, next_batch_df['id'].to_numpy()
+
+    def _post_batch_notice(self, show_func, title, message):
+        """Schedule a notice from the worker thread on the main thread"""
+        self.main_window.root.after(0, self._on_batch_notice, show_func, title, message)
+
+    def _on_batch_notice(self, show_func, title, message):
+        """Restore manual mode UI and show notice (main thread)"""
+        self.reset_manual_mode()
+        show_func(title, message)
 
-            # Find next batch to process using helper
-            output_path = PromptHelper.generate_output_path(input_file, prompt_type)
-            next_batch_df = PromptHelper.find_next_batch(df, output_path, batch_size)
+    def _on_batch_failed(self, error, details):
+        """Handle unexpected error while preparing batch (main thread)"""
+        messagebox.showerror("Error", f"Failed to copy prompt: {error}")
+        self.main_window.log_message(f"Error in copy_prompt_manual: {error}\n{details}".rstrip())
+        self.reset_manual_mode()
+
+    def _on_batch_ready(self, result):
+        """Copy prepared prompt to clipboard and update UI (main thread)"""
+        full_prompt, next_batch_df, batch_ids = result
+
+        try:
+            # Copy to clipboard with Tk's native clipboard (no helper process spawn)
+            self.parent.clipboard_clear()
+            self.parent.clipboard_append(full_prompt)
+            self.parent.update()
+        except Exception as e:
+            self._on_batch_failed(str(e), "")
+            return
+
+        # Store batch data for later processing - IMPORTANT
+        self.current_prompt_text = full_prompt
+        # Batch frame is freshly gathered by find_next_batch, so no defensive copy is needed;
+        # snapshot the two columns used when the response is pasted
+        self.manual_batch_data = next_batch_df
+        self.manual_batch_ids = batch_ids
+        self.manual_batch_texts = next_batch_df['text'].to_numpy()
+
+        # Update UI
+        self.copy_prompt_btn.config(state="disabled")
+        self.paste_response_btn.config(state="normal")
+        self.cancel_btn.config(state="normal")
+
+        # Ids are kept as an ndarray, so the range comes from two numpy reductions
+        batch_id_range = f"{batch_ids.min()}-{batch_ids.max()}"
+        self.manual_status_label.config(
+            text=f"Prompt copied! Processing batch: IDs {batch_id_range} ({len(next_batch_df)} rows)",
+            foreground="green"
+        )
 
-            if next_batch_df is None or next_batch_df.empty:
-                messagebox.showinfo("Info", "No more batches to process")
-                return
+        # One log entry per action keeps log widget updates to a single insert
+        self.main_window.log_message(
+            f"Batch data stored: {len(self.manual_batch_data)} rows\n"
+            f"Manual mode: Copied prompt for batch IDs {batch_id_range}"
+        )
 
-            # Create batch text using helper
-            batch_text = PromptHelper.create_batch_text(next_batch_df)
+    def paste_response_manual(self):
+        """Process pasted response from clipboard"""
+        # Validate that we have batch data
+        if self.manual_batch_data is None or self.manual_batch_data.empty:
+            messagebox.showwarning("Warning", "No batch data available. Please copy prompt first.")
+            return
 
-            # Format prompt
-            count_info = f"Source text consists of {len(next_batch_df)} numbered lines from 1 to {len(next_batch_df)}."
-            full_prompt = prompt_template.format(count_info=count_info, text=batch_text)
+        # Get response from clipboard
+        try:
+            response_text = self.parent.clipboard_get()
+        except tk.TclError:
+            # Raised by Tk when clipboard is empty or holds no text
+            response_text = ""
 
-            # Copy to clipboard
-            pyperclip.copy(full_prompt)
+        if not response_text or not response_text.strip():
+            messagebox.showwarning("Warning", "Clipboard is empty or contains no text")
+            return
 
-            # Store batch data for later processing - IMPORTANT
-            self.current_prompt_text = full_prompt
-            self.manual_batch_data = next_batch_df.copy()  # Make a copy to ensure data persists
-            self.manual_batch_ids = next_batch_df['id'].tolist()
+        # Get batch size safely
+        batch_size = len(self.manual_batch_data) if self.manual_batch_data is not None else 0
 
-            # Verify data was stored
-            self.main_window.log_message(f"Batch data stored: {len(self.manual_batch_data)} rows")
+        if batch_size == 0:
+            messagebox.showwarning("Warning", "Invalid batch data")
+            return
 
-            # Update UI
-            self.copy_prompt_btn.config(state="disabled")
-            self.paste_response_btn.config(state="normal")
-            self.cancel_btn.config(state="normal")
+        translation_settings = self.main_window.translation_tab.get_settings()
+        input_file = translation_settings.get('input_file')
 
-            batch_id_range = f"{min(self.manual_batch_ids)}-{max(self.manual_batch_ids)}"
-            self.manual_status_label.config(
-                text=f"Prompt copied! Processing batch: IDs {batch_id_range} ({len(next_batch_df)} rows)",
-                foreground="green"
-            )
+        if not input_file:
+            messagebox.showwarning("Warning", "Input file not found")
+            return
 
-            self.main_window.log_message(f"Manual mode: Copied prompt for batch IDs {batch_id_range}")
+        # Parse and save in background so the UI stays responsive on large batches
+        self.paste_response_btn.config(state="disabled")
+        self.cancel_btn.config(state="disabled")
+        self.manual_status_label.config(text="Processing response...", foreground="blue")
+        self.manual_progress.grid()
+        self.manual_progress.start(10)
+
+        thread = threading.Thread(
+            target=self._run_paste_worker,
+            args=(response_text, self.manual_batch_ids, self.manual_batch_texts,
+                  input_file, self.prompt_type.get()),
+            daemon=True
+        )
+        thread.start()
 
+    def _run_paste_worker(self, response_text, batch_ids, batch_texts, input_file, prompt_type):
+        """Run response processing in background thread and hand result to main thread"""
+        try:
+            result = self._paste_worker(response_text, batch_ids, batch_texts, input_file, prompt_type)
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to copy prompt: {str(e)}")
-            self.main_window.log_message(f"Error in copy_prompt_manual: {str(e)}")
             import traceback
-            self.main_window.log_message(traceback.format_exc())
-            self.reset_manual_mode()
+            self.main_window.root.after(0, self._on_paste_failed, str(e), traceback.format_exc())
+            return
 
-    def paste_response_manual(self):
-        """Process pasted response from clipboard"""
+        if result is not None:
+            self.main_window.root.after(0, self._on_paste_done, result)
+
+    def _paste_worker(self, response_text, batch_ids, batch_texts, input_file, prompt_type):
+        """Parse response and save results (background thread)
+
+        Returns (successful_count, batch_size, output_path), or None after posting
+        a notice to the main thread.
+        """
+        batch_size = len(batch_ids)
+
+        # Parse response
+        from helper.translation_processor import TranslationProcessor
+        translations = TranslationProcessor.parse_numbered_text(
+            response_text,
+            batch_size
+        )
+
+        # Check if we got valid translations
+        if not translations:
+            self.main_window.root.after(0, self._on_paste_notice, messagebox.showwarning, "Warning",
+                                        "Failed to parse response. Please check the format.")
+            return None
+
+        from helper.prompt_helper import PromptHelper
+
+        output_path = PromptHelper.generate_output_path(input_file, prompt_type)
+
+        # Rows saved so far, reused from the last paste unless the file changed since
+        existing_results, max_saved_id = self._load_saved_results(output_path)
+
+        # Build rows for new translations from the stored column arrays
+        new_rows = []
+        add_row = new_rows.append
+        for i in range(min(len(batch_ids), len(translations))):
+            translation = translations[i]
+            add_row({
+                'id': batch_ids[i],
+                'raw': batch_texts[i],
+                'edit': translation if translation else '',
+                'status': '' if translation else 'failed'
+            })
+        successful_count = sum(1 for row in new_rows if row['edit'])
+
+        # Append new rows (or rewrite when ids are out of order) using helper
+        if new_rows:
+            PromptHelper.append_results(new_rows, existing_results, output_path, max_saved_id=max_saved_id)
+            new_max_id = max(row['id'] for row in new_rows)
+            if max_saved_id is not None:
+                new_max_id = max(new_max_id, max_saved_id)
+            self._remember_saved_results(output_path, existing_results, new_max_id)
+
+        return successful_count, batch_size, output_path
+
+    def _load_saved_results(self, output_path):
+        """Return (existing_results, max id) for the output file (background thread)
+
+        The rows kept by the last paste are reused while the file still has the
+        mtime and size written then; otherwise (first paste, another writer) the
+        file is loaded in full.
+        """
+        from helper.prompt_helper import PromptHelper
+
+        # Taken out of the cache: if saving fails, the next paste reloads the file
+        saved, self._saved_results = self._saved_results, None
         try:
-            # Validate that we have batch data
-            if self.manual_batch_data is None or self.manual_batch_data.empty:
-                messagebox.showwarning("Warning", "No batch data available. Please copy prompt first.")
-                return
-
-            # Get response from clipboard
-            response_text = pyperclip.paste()
-
-            if not response_text or not response_text.strip():
-                messagebox.showwarning("Warning", "Clipboard is empty or contains no text")
-                return
-
-            # Get batch size safely
-            batch_size = len(self.manual_batch_data) if self.manual_batch_data is not None else 0
-
-            if batch_size == 0:
-                messagebox.showwarning("Warning", "Invalid batch data")
-                return
-
-            # Parse response
-            from helper.translation_processor import TranslationProcessor
-            translations = TranslationProcessor.parse_numbered_text(
-                response_text,
-                batch_size
-            )
-
-            # Check if we got valid translations
-            if not translations:
-                messagebox.showwarning("Warning", "Failed to parse response. Please check the format.")
-                return
-
-            # Process and save results
-            translation_settings = self.main_window.translation_tab.get_settings()
-            input_file = translation_settings.get('input_file')
-
-            if not input_file:
-                messagebox.showwarning("Warning", "Input file not found")
-                return
-
-            # Import PromptHelper here if not already imported at top
-            from helper.prompt_helper import PromptHelper
-
-            output_path = PromptHelper.generate_output_path(input_file, self.prompt_type.get())
-
-            # Load existing results using helper
-            existing_results, _, _ = PromptHelper.load_existing_results(output_path)
-
-            # Update with new translations
-            successful_count = 0
-            for (_, row), translation in zip(self.manual_batch_data.iterrows(), translations):
-                existing_results[row['id']] = {
-                    'id': row['id'],
-                    'raw': row['text'],
-                    'edit': translation if translation else '',
-                    'status': '' if translation else 'failed'
-                }
-                if translation:
-                    successful_count += 1
-
-            # Save results using helper
-            PromptHelper.save_results(existing_results, output_path)
-
-            # Log and update UI
-            self.main_window.log_message(
-                f"Manual batch processed: {successful_count}/{batch_size} successful"
-            )
-            self.main_window.log_message(f"Results saved to: {output_path}")
-
-            # Reset UI
-            self.reset_manual_mode()
-
-            # Update progress display
-            self.main_window.update_progress_display()
-
-            messagebox.showinfo("Success",
-                                f"Batch processed successfully!\n"
-                                f"Successful: {successful_count}/{batch_size}")
-
-        except AttributeError as e:
-            messagebox.showerror("Error", f"Data error: {str(e)}\nPlease copy prompt first.")
-            self.main_window.log_message(f"AttributeError in paste_response_manual: {str(e)}")
-            self.reset_manual_mode()
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to process response: {str(e)}")
-            self.main_window.log_message(f"Error in paste_response_manual: {str(e)}")
-            import traceback
-            self.main_window.log_message(traceback.format_exc())
+            st = os.stat(output_path)
+            if saved is not None and saved[0] == (output_path, st.st_mtime_ns, st.st_size):
+                return saved[1], saved[2]
+        except OSError:
+            pass
+
+        existing_results, _, _ = PromptHelper.load_existing_results(output_path)
+        return existing_results, (max(existing_results) if existing_results else None)
+
+    def _remember_saved_results(self, output_path, existing_results, max_id):
+        """Keep the rows just written for the next paste, keyed on the file's new mtime and size"""
+        try:
+            st = os.stat(output_path)
+        except OSError:
+            return
+        self._saved_results = ((output_path, st.st_mtime_ns, st.st_size), existing_results, max_id)
+
+    def _stop_paste_progress(self):
+        """Hide the busy indicator shown while processing a response"""
+        self.manual_progress.stop()
+        self.manual_progress.grid_remove()
+
+    def _on_paste_notice(self, show_func, title, message):
+        """Let the user paste again after a recoverable problem (main thread)"""
+        self._stop_paste_progress()
+        self.paste_response_btn.config(state="normal")
+        self.cancel_btn.config(state="normal")
+        self.manual_status_label.config(text="")
+        show_func(title, message)
+
+    def _on_paste_failed(self, error, details):
+        """Handle unexpected error while processing response (main thread)"""
+        self._stop_paste_progress()
+        self.paste_response_btn.config(state="normal")
+        self.cancel_btn.config(state="normal")
+        self.manual_status_label.config(text="")
+        messagebox.showerror("Error", f"Failed to process response: {error}")
+        self.main_window.log_message(f"Error in paste_response_manual: {error}\n{details}".rstrip())
+
+    def _on_paste_done(self, result):
+        """Finalize UI after response was saved (main thread)"""
+        successful_count, batch_size, output_path = result
+        self._stop_paste_progress()
+
+        # Log and update UI
+        self.main_window.log_message(
+            f"Manual batch processed: {successful_count}/{batch_size} successful\n"
+            f"Results saved to: {output_path}"
+        )
+
+        # Reset UI
+        self.reset_manual_mode()
+
+        # Update progress display
+        self.main_window.update_progress_display()
+
+        messagebox.showinfo("Success",
+                            f"Batch processed successfully!\n"
+                            f"Successful: {successful_count}/{batch_size}")
+
     def cancel_manual(self):
         """Cancel current manual batch processing"""
         self.reset_manual_mode()
@@ -588,9 +802,12 @@ class ProcessingTab:
         self.cancel_btn.config(state="disabled")
         self.current_prompt_text = ""
         # Don't set to None immediately, just clear the dataframe
-        if self.manual_batch_data is not None and not isinstance(self.manual_batch_data, pd.DataFrame):
-            self.manual_batch_data = None
-        elif isinstance(self.manual_batch_data, pd.DataFrame):
-            self.manual_batch_data = pd.DataFrame()  # Empty dataframe instead of None
+        if self.manual_batch_data is not None:
+            import pandas as pd
+            if isinstance(self.manual_batch_data, pd.DataFrame):
+                self.manual_batch_data = pd.DataFrame()  # Empty dataframe instead of None
+            else:
+                self.manual_batch_data = None
         self.manual_batch_ids = []
+        self.manual_batch_texts = []
         self.manual_status_label.config(text="")
\ No newline at end of file
@@ -1,6 +1,14 @@
 import tkinter as tk
 from tkinter import ttk, filedialog
 import os
+from functools import lru_cache
+
+
+@lru_cache(maxsize=32)
+def _basename(path):
+    """Cached os.path.basename - the same input path is looked up repeatedly"""
+    return os.path.basename(path)
+
 
 class TranslationTab:
     """Translation settings tab"""
@@ -28,6 +36,17 @@ class TranslationTab:
         default_output = os.path.join(os.path.expanduser("~"), "Documents", "AIBridge")
         self.output_directory = tk.StringVar(value=default_output)
 
+        # Pending after() ids for debounced save and progress refresh
+        self._save_after = None
+        self._progress_after = None
+
+        # Tcl names of variables changed since the last flush
+        self._changed_vars = set()
+        self._flush_scheduled = False
+
+        # Full path tooltip, created on first hover and reused afterwards
+        self._tooltip = None
+
     def bind_variable_changes(self):
         """Bind variable changes to auto-save"""
         variables = [
@@ -37,12 +56,51 @@ class TranslationTab:
             self.output_directory
         ]
 
+        # One handler for all variables, changes are handled together once Tk is idle
         for var in variables:
-            var.trace('w', lambda *args: self.main_window.save_settings())
-
-        self.start_id.trace('w', lambda *args: self.main_window.update_progress_display())
-        self.stop_id.trace('w', lambda *args: self.main_window.update_progress_display())
-        self.input_file.trace('w', lambda *args: [self.main_window.update_progress_display(), self.update_output_filename()])
+            var.trace('w', self._on_change)
+
+    def _on_change(self, name, *args):
+        """Record a variable change and schedule a single idle flush"""
+        self._changed_vars.add(name)
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self.parent.after_idle(self._flush)
+
+    def _flush(self):
+        """Handle all variable changes since the last flush at once"""
+        changed = self._changed_vars
+        self._changed_vars = set()
+        self._flush_scheduled = False
+
+        if str(self.input_file) in changed:
+            self.update_output_filename()
+        # Output directory does not affect progress
+        if changed - {str(self.output_directory)}:
+            self._schedule_progress_update()
+        self._schedule_save()
+
+    def _schedule_save(self, *args):
+        """Debounce auto-save so a burst of keystrokes results in a single save"""
+        if self._save_after:
+            self.parent.after_cancel(self._save_after)
+        self._save_after = self.parent.after(300, self._run_save)
+
+    def _run_save(self):
+        """Run the debounced save"""
+        self._save_after = None
+        self.main_window.save_settings()
+
+    def _schedule_progress_update(self, *args):
+        """Debounce progress refresh while ID range is being typed"""
+        if self._progress_after:
+            self.parent.after_cancel(self._progress_after)
+        self._progress_after = self.parent.after(100, self._run_progress_update)
+
+    def _run_progress_update(self):
+        """Run the debounced progress refresh"""
+        self._progress_after = None
+        self.main_window.update_progress_display()
 
     def create_content(self):
         """Create tab content"""
@@ -77,19 +135,19 @@ class TranslationTab:
         def show_full_path(event):
             if self.input_file.get():
                 input_label.config(cursor="hand2")
-                # Create tooltip
-                tooltip = tk.Toplevel(input_label)
-                tooltip.wm_overrideredirect(True)
-                tooltip.wm_geometry(f"+{event.x_root+10}+{event.y_root+10}")
-                label = ttk.Label(tooltip, text=self.input_file.get(),
-                                  background="lightyellow", relief="solid", borderwidth=1)
-                label.pack()
-                input_label.tooltip = tooltip
+                if self._tooltip is None:
+                    # Create tooltip once; label follows input_file through textvariable
+                    self._tooltip = tk.Toplevel(input_label)
+                    self._tooltip.wm_overrideredirect(True)
+                    ttk.Label(self._tooltip, textvariable=self.input_file,
+                              background="lightyellow", relief="solid", borderwidth=1).pack()
+                self._tooltip.wm_geometry(f"+{event.x_root+10}+{event.y_root+10}")
+                self._tooltip.deiconify()
 
         def hide_full_path(event):
             input_label.config(cursor="")
-            if hasattr(input_label, 'tooltip'):
-                input_label.tooltip.destroy()
+            if self._tooltip is not None:
+                self._tooltip.withdraw()
 
         input_label.bind("<Enter>", show_full_path)
         input_label.bind("<Leave>", hide_full_path)
@@ -131,7 +189,7 @@ class TranslationTab:
             prompt_type = self.main_window.processing_tab.prompt_type.get()
 
         # Generate output filename
-        input_filename = os.path.basename(self.input_file.get())
+        input_filename = _basename(self.input_file.get())
         filename_without_ext, ext = os.path.splitext(input_filename)
 
         # Keep the same extension as input file
@@ -178,8 +236,9 @@ class TranslationTab:
             # Store the full path
             self.input_file.set(filename)
             # Display only basename in label
-            self.input_label_var.set(os.path.basename(filename))
-            self.main_window.log_message(f"Input file selected: {os.path.basename(filename)}")
+            basename = _basename(filename)
+            self.input_label_var.set(basename)
+            self.main_window.log_message(f"Input file selected: {basename}")
 
             # Detect and log language
             lang = self.detect_language(filename)
@@ -194,14 +253,9 @@ class TranslationTab:
 
     def detect_language(self, filepath):
         """Detect language from filename"""
-        filename = os.path.basename(filepath)
-
-        # Look for language codes in filename
-        for lang in ['JP', 'EN', 'KR', 'CN', 'VI']:
-            if lang in filename.upper():
-                return lang
-
-        return None
+        from helper.prompt_helper import PromptHelper
+        # Same cached detection as the output folder and prompt lookup, so the logged code is the one used
+        return PromptHelper.detect_language(filepath)
 
     def get_settings(self):
         """Get current tab settings"""
@@ -220,7 +274,7 @@ class TranslationTab:
                 self.input_file.set(settings['input_file'])
                 # Update display label
                 if settings['input_file']:
-                    self.input_label_var.set(os.path.basename(settings['input_file']))
+                    self.input_label_var.set(_basename(settings['input_file']))
 
             if 'start_id' in settings:
                 self.start_id.set(settings['start_id'])
@@ -1,6 +1,91 @@
+import hashlib
+import io
 import json
 import os
-from helper.key_encryption import KeyEncryption
+import queue
+import threading
+from dataclasses import asdict, dataclass
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Buffer size for settings file I/O - whole file goes through in a single read/write call
+_IO_BUFFER_SIZE = 1 << 16
+
+# Settings are written compact; set AIBRIDGE_PRETTY=1 for an indented, human-readable file
+_PRETTY_SETTINGS = os.environ.get('AIBRIDGE_PRETTY') == '1'
+
+
+def _json_default(obj):
+    """Stdlib json fallback for dataclasses (orjson serializes them natively)"""
+    return asdict(obj)
+
+
+def _dumps_settings(settings):
+    """Serialize settings to JSON bytes (orjson when available)"""
+    if orjson is not None:
+        return orjson.dumps(settings, option=orjson.OPT_INDENT_2 if _PRETTY_SETTINGS else 0)
+    if _PRETTY_SETTINGS:
+        return json.dumps(settings, indent=2, default=_json_default).encode('utf-8')
+    return json.dumps(settings, separators=(',', ':'), default=_json_default).encode('utf-8')
+
+
+def _loads_settings(data):
+    """Parse settings JSON bytes (orjson when available)"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+@dataclass(slots=True)
+class WindowGeometry:
+    """Saved main window size and position"""
+    width: int = 500
+    height: int = 750
+    x: int = 1400
+    y: int = 20
+
+
+class LazyKeys:
+    """Stored API keys that are only decrypted when first read"""
+
+    __slots__ = ('ciphertexts', 'service', '_decrypt', '_keys')
+
+    def __init__(self, ciphertexts, decrypt_list, service=''):
+        self.ciphertexts = tuple(key for key in ciphertexts if key)
+        self.service = service
+        self._decrypt = decrypt_list
+        self._keys = None
+
+    @property
+    def decrypted(self):
+        """Whether the keys have been decrypted yet"""
+        return self._keys is not None
+
+    def _materialize(self):
+        if self._keys is None:
+            try:
+                self._keys = self._decrypt(list(self.ciphertexts))
+            except Exception as e:
+                print(f"Warning: Could not decrypt keys for {self.service}: {e}")
+                self._keys = []
+        return self._keys
+
+    def __iter__(self):
+        return iter(self._materialize())
+
+    def __getitem__(self, index):
+        return self._materialize()[index]
+
+    def __len__(self):
+        # A single stored token may hold several keys, so the count needs decrypting
+        return len(self._materialize())
+
+    def __bool__(self):
+        return bool(self.ciphertexts)
 
 
 class WindowManager:
@@ -8,33 +93,65 @@ class WindowManager:
 
     def __init__(self, main_window):
         self.main_window = main_window
-        self.key_encryption = KeyEncryption()
+        # Created on first use so startup does not pay for loading the crypto backend
+        self._key_encryption = None
+
+        # Per service: plaintext keys of the last save and their encrypted list,
+        # so unchanged keys are not re-encrypted on every save
+        self._last_keys_per_service = {}
+        self._last_encrypted = {}
+
+        # Main window references used by save_settings, resolved once the tabs exist
+        self._resolved = False
+        self._get_tab_settings = None
+        self._app_key_var = None
+        self._log = None
+
+        # Digest of the last settings / API keys content written to or read from disk
+        self._last_saved_hash = None
+        self._last_keys_hash = None
+
+        # Parsed bot_settings.json shared by the load_* methods, keyed by file mtime
+        self._cached_settings = None
+        self._cache_mtime = None
+
+        # Serialized files ({path: bytes}) are written by a background thread, only the latest snapshot is kept
+        self._writer_q = queue.Queue(maxsize=1)
+        threading.Thread(target=self._writer_loop, daemon=True).start()
 
         # Default window settings
-        self.window_settings = {
-            'width': 500,
-            'height': 750,
-            'x': 1400,
-            'y': 20
-        }
+        self.window_settings = WindowGeometry()
 
         # Store original size for compact mode toggle
         self.original_size = {'width': 500, 'height': 750}
 
+        # Latest (width, height, x, y) from <Configure>, applied to window_settings when dirty
+        self._geometry = None
+        self._geometry_dirty = False
+
+    @property
+    def key_encryption(self):
+        """KeyEncryption instance, created lazily"""
+        if self._key_encryption is None:
+            from helper.key_encryption import KeyEncryption
+            self._key_encryption = KeyEncryption()
+        return self._key_encryption
+
     def load_initial_settings(self):
         """Load initial settings including window position before GUI setup"""
         try:
-            if os.path.exists('bot_settings.json'):
-                with open('bot_settings.json', 'r') as f:
-                    settings = json.load(f)
-
+            settings = self._load_raw()
+            if settings:
                 # Load window settings if they exist
                 if 'window' in settings:
-                    self.window_settings.update(settings['window'])
+                    window = settings['window']
+                    for field in ('width', 'height', 'x', 'y'):
+                        if field in window:
+                            setattr(self.window_settings, field, window[field])
                     # Store original size
                     self.original_size = {
-                        'width': self.window_settings.get('width', 500),
-                        'height': self.window_settings.get('height', 750)
+                        'width': self.window_settings.width,
+                        'height': self.window_settings.height
                     }
 
                 # Load app key early if it exists
@@ -48,33 +165,19 @@ class WindowManager:
         """Setup window with loaded settings"""
         settings = self.window_settings
 
-        width = max(500, settings.get('width', 500))
-        height = max(750, settings.get('height', 750))
+        width = max(500, settings.width)
+        height = max(750, settings.height)
 
-        # Get saved position or use default
         screen_width = self.main_window.root.winfo_screenwidth()
         screen_height = self.main_window.root.winfo_screenheight()
 
-        # Use saved position if available, otherwise use default
-        if 'x' in settings and 'y' in settings:
-            x = settings['x']
-            y = settings['y']
-        else:
-            # Default position: right half of screen + 20px, y = 20
-            default_x = max(20, screen_width // 2) + 20
-            default_y = 20
-            x = default_x
-            y = default_y
-
-        # Ensure window fits on screen
-        if x + width > screen_width:
-            x = max(0, screen_width - width)
-        if y + height > screen_height:
-            y = max(0, screen_height - height)
-
-        # Ensure minimum position values
-        x = max(0, x)
-        y = max(0, y)
+        # Saved position (defaults come from WindowGeometry)
+        x = settings.x
+        y = settings.y
+
+        # Keep the window on screen: clamp into [0, screen - size], pinning to 0 if it is larger than the screen
+        x = min(max(x, 0), max(0, screen_width - width))
+        y = min(max(y, 0), max(0, screen_height - height))
 
         # Set window properties
         self.main_window.root.minsize(500, 750)
@@ -82,67 +185,55 @@ class WindowManager:
         self.main_window.root.resizable(True, True)
         self.main_window.root.attributes('-topmost', True)
 
+        # Track geometry as it changes so saving does not need to query Tk
+        self.main_window.root.bind('<Configure>', self._on_configure)
+
+    def _on_configure(self, event):
+        """Cache window geometry when the main window is moved or resized"""
+        root = self.main_window.root
+        # Child widgets propagate <Configure> to the root binding - only the window itself matters
+        if event.widget is not root:
+            return
+        # Compact mode geometry is temporary and not persisted
+        if getattr(self.main_window, 'compact_mode', False):
+            return
+
+        # Only record the values here; window_settings is rebuilt on the next save
+        self._geometry = (event.width, event.height, root.winfo_x(), root.winfo_y())
+        self._geometry_dirty = True
+        # Update original size (read directly by compact mode toggle)
+        self.original_size['width'] = event.width
+        self.original_size['height'] = event.height
+
     def save_settings(self):
         """Save all settings to file with encrypted API keys"""
         try:
-            # Check if compact_mode exists before accessing it
-            if hasattr(self.main_window, 'compact_mode'):
-                # Save current window settings (only if not in compact mode)
-                if not self.main_window.compact_mode:
-                    try:
-                        self.main_window.root.update_idletasks()
-                        self.window_settings = {
-                            'width': self.main_window.root.winfo_width(),
-                            'height': self.main_window.root.winfo_height(),
-                            'x': self.main_window.root.winfo_x(),
-                            'y': self.main_window.root.winfo_y()
-                        }
-                        # Update original size
-                        self.original_size = {
-                            'width': self.window_settings['width'],
-                            'height': self.window_settings['height']
-                        }
-                    except:
-                        pass
-            else:
-                # If compact_mode doesn't exist yet, save current window settings
-                try:
-                    self.main_window.root.update_idletasks()
-                    self.window_settings = {
-                        'width': self.main_window.root.winfo_width(),
-                        'height': self.main_window.root.winfo_height(),
-                        'x': self.main_window.root.winfo_x(),
-                        'y': self.main_window.root.winfo_y()
-                    }
-                except:
-                    pass
+            # Apply geometry recorded by _on_configure only if the window moved or resized
+            if self._geometry_dirty:
+                self.window_settings = WindowGeometry(*self._geometry)
+                self._geometry_dirty = False
+
+            if not self._resolved:
+                self._resolve_main_window_refs()
 
             # Get settings from tabs if they exist
-            tab_settings = {}
-            if hasattr(self.main_window, 'translation_tab') and hasattr(self.main_window, 'processing_tab'):
-                tab_settings = self.main_window.get_current_settings()
+            tab_settings = self._get_tab_settings() if self._get_tab_settings is not None else {}
 
             # Add application key to settings
-            app_key = ""
-            if hasattr(self.main_window, 'app_key_var'):
-                app_key = self.main_window.app_key_var.get()
+            app_key = self._app_key_var.get() if self._app_key_var is not None else ""
 
             # Process processing settings
             processing_settings = tab_settings.get('processing', {})
 
             # Encrypt API keys in processing settings
-            if 'api_configs' in processing_settings:
-                for service, config in processing_settings['api_configs'].items():
-                    if 'keys' in config and config['keys']:
-                        # Only encrypt plain text keys
-                        encrypted_keys = []
-                        for key in config['keys']:
-                            if key:
-                                encrypted = self.key_encryption.encrypt_key(key)
-                                encrypted_keys.append(encrypted)
-                        config['keys'] = encrypted_keys
-                    else:
-                        config['keys'] = []
+            self._transform_keys_on_save(processing_settings)
+
+            # Encrypted keys are kept in bot_keys.json so they are not rewritten with every change
+            keys_block = {}
+            for service, config in processing_settings.get('api_configs', {}).items():
+                keys = config.pop('keys', None)
+                if keys:
+                    keys_block[service] = keys
 
             # Combine all settings
             all_settings = {
@@ -153,26 +244,176 @@ class WindowManager:
                 'app_key': app_key
             }
 
-            # Save to file
-            with open('bot_settings.json', 'w') as f:
-                json.dump(all_settings, f, indent=2)
+            # Save to file: serialize first, write once, then swap in atomically
+            data = _dumps_settings(all_settings)
+            keys_data = _dumps_settings(keys_block)
+
+            # Skip files whose content did not change since the last save
+            data_hash = self._settings_hash(data)
+            keys_hash = self._settings_hash(keys_data)
+            writes = {}
+            if data_hash != self._last_saved_hash:
+                writes['bot_settings.json'] = data
+            if keys_hash != self._last_keys_hash:
+                writes['bot_keys.json'] = keys_data
+            if not writes:
+                return
+
+            # Hand off to writer thread, merging into a snapshot that has not been written yet
+            try:
+                self._writer_q.put_nowait(writes)
+            except queue.Full:
+                try:
+                    pending = self._writer_q.get_nowait()
+                    self._writer_q.task_done()
+                    pending.update(writes)
+                    writes = pending
+                except queue.Empty:
+                    pass
+                self._writer_q.put_nowait(writes)
+            self._last_saved_hash = data_hash
+            self._last_keys_hash = keys_hash
+            self._cached_settings = None
 
         except Exception as e:
             # Only log if main_window has log_message method
-            if hasattr(self.main_window, 'log_message'):
-                self.main_window.log_message(f"Warning: Could not save settings: {e}")
+            if self._log is not None:
+                self._log(f"Warning: Could not save settings: {e}")
             else:
                 print(f"Warning: Could not save settings: {e}")
 
+    def _resolve_main_window_refs(self):
+        """Look up main window attributes used when saving, so later saves skip the hasattr checks"""
+        main_window = self.main_window
+        if hasattr(main_window, 'translation_tab') and hasattr(main_window, 'processing_tab'):
+            self._get_tab_settings = main_window.get_current_settings
+        self._app_key_var = getattr(main_window, 'app_key_var', None)
+        self._log = getattr(main_window, 'log_message', None)
+        # Keep resolving on each save until the tabs have been created
+        self._resolved = self._get_tab_settings is not None
+
+    def _writer_loop(self):
+        """Write queued settings snapshots to disk (background thread)"""
+        while True:
+            writes = self._writer_q.get()
+            try:
+                for path, data in writes.items():
+                    tmp_path = path + '.tmp'
+                    with open(tmp_path, 'wb', buffering=0) as raw, \
+                            io.BufferedWriter(raw, buffer_size=_IO_BUFFER_SIZE) as f:
+                        f.write(data)
+                    os.replace(tmp_path, path)
+            except Exception as e:
+                # Force the next save to retry the write
+                self._last_saved_hash = None
+                self._last_keys_hash = None
+                print(f"Warning: Could not save settings: {e}")
+            finally:
+                self._writer_q.task_done()
+
+    def flush_pending_writes(self):
+        """Block until queued settings have been written"""
+        self._writer_q.join()
+
+    def _load_raw(self):
+        """Read and parse bot_settings.json, reusing the parsed dict while the file is unchanged"""
+        try:
+            mtime = os.stat('bot_settings.json').st_mtime_ns
+        except OSError:
+            return {}
+
+        if self._cached_settings is not None and mtime == self._cache_mtime:
+            return self._cached_settings
+
+        with open('bot_settings.json', 'rb', buffering=0) as raw, \
+                io.BufferedReader(raw, buffer_size=_IO_BUFFER_SIZE) as f:
+            data = f.read()
+        self._cached_settings = _loads_settings(data)
+        self._cache_mtime = mtime
+        self._last_saved_hash = self._settings_hash(data)
+        return self._cached_settings
+
+    def _load_keys(self):
+        """Read encrypted API keys per service from bot_keys.json"""
+        try:
+            with open('bot_keys.json', 'rb', buffering=0) as raw, \
+                    io.BufferedReader(raw, buffer_size=_IO_BUFFER_SIZE) as f:
+                data = f.read()
+        except OSError:
+            return {}
+        self._last_keys_hash = self._settings_hash(data)
+        return _loads_settings(data)
+
+    def load_settings(self):
+        """Reload window and tab settings from file"""
+        self.load_initial_settings()
+        self.load_tab_settings()
+
+    @staticmethod
+    def _settings_hash(data):
+        """Short digest of serialized settings used to detect unchanged saves"""
+        return hashlib.blake2b(data, digest_size=16).digest()
+
+    def _transform_keys_on_save(self, processing_settings):
+        """Replace plain text API keys with ciphertext (services with unchanged keys reuse last result)"""
+        if 'api_configs' not in processing_settings:
+            return
+
+        api_configs = processing_settings['api_configs']
+        for service, config in api_configs.items():
+            keys = config.get('keys') or ()
+            if isinstance(keys, LazyKeys):
+                if not keys.decrypted:
+                    # Never read since loading - stored ciphertext is still current
+                    config['keys'] = list(keys.ciphertexts)
+                    continue
+                # Stored single token can be reused as long as the keys stay the same;
+                # legacy per-key lists and plain text keys get re-encrypted into one token
+                if service not in self._last_encrypted and len(keys.ciphertexts) == 1 \
+                        and keys.ciphertexts[0] not in keys:
+                    self._last_keys_per_service[service] = tuple(key for key in keys if key)
+                    self._last_encrypted[service] = list(keys.ciphertexts)
+
+            current = tuple(key for key in keys if key)
+            if service in self._last_encrypted and self._last_keys_per_service.get(service) == current:
+                config['keys'] = self._last_encrypted[service]
+                continue
+
+            # All keys of a service are encrypted together into a single token
+            encrypted_keys = self.key_encryption.encrypt_keys_list(current)
+            self._last_keys_per_service[service] = current
+            self._last_encrypted[service] = encrypted_keys
+            config['keys'] = encrypted_keys
+
+    def _transform_keys_on_load(self, processing_settings, stored_keys):
+        """Wrap stored API key ciphertext in LazyKeys, decrypted per service on first use
+
+        Keys from bot_keys.json take precedence over keys left in older settings files.
+        Works on copies, the parsed settings are cached.
+        """
+        if 'api_configs' in processing_settings or stored_keys:
+            processing_settings['api_configs'] = {
+                service: dict(config) for service, config in processing_settings.get('api_configs', {}).items()
+            }
+            for service, keys in stored_keys.items():
+                processing_settings['api_configs'].setdefault(service, {})['keys'] = keys
+            for service, config in processing_settings['api_configs'].items():
+                if 'keys' in config and config['keys']:
+                    config['keys'] = LazyKeys(config['keys'], self._decrypt_keys, service)
+                else:
+                    config['keys'] = []
+
+    def _decrypt_keys(self, encrypted_keys):
+        """Decrypt one service's stored API keys (creates KeyEncryption on first use)"""
+        return self.key_encryption.decrypt_keys_list(encrypted_keys)
+
     def load_tab_settings(self):
         """Load tab settings after tabs are created with decrypted API keys"""
         try:
-            if not os.path.exists('bot_settings.json'):
+            settings = self._load_raw()
+            if not settings:
                 return
     
-            with open('bot_settings.json', 'r') as f:
-                settings = json.load(f)
-    
             # Load translation settings
             if 'translation' in settings:
                 self.main_window.translation_tab.load_settings(settings['translation'])
@@ -182,22 +423,7 @@ class WindowManager:
                 processing_settings = settings['processing'].copy()
     
                 # Decrypt API keys if they exist
-                if 'api_configs' in processing_settings:
-                    for service, config in processing_settings['api_configs'].items():
-                        if 'keys' in config and config['keys']:
-                            try:
-                                # Decrypt each key individually
-                                decrypted_keys = []
-                                for encrypted_key in config['keys']:
-                                    if encrypted_key:
-                                        decrypted = self.key_encryption.decrypt_key(encrypted_key)
-                                        decrypted_keys.append(decrypted)
-                                config['keys'] = decrypted_keys
-                            except Exception as e:
-                                print(f"Warning: Could not decrypt keys for {service}: {e}")
-                                config['keys'] = []
-                        else:
-                            config['keys'] = []
+                self._transform_keys_on_load(processing_settings, self._load_keys())
     
                 # Load processing settings with decrypted keys
                 self.main_window.processing_tab.load_settings(processing_settings)
@@ -8,6 +8,8 @@ class AIAPIHandler:
     def __init__(self, main_window):
         self.main_window = main_window
         self.failed_keys = set()
+        # When True a 429 leaves the key usable; the caller backs off and retries instead
+        self.retry_rate_limits = False
 
     def get_random_api_key(self, api_keys):
         """Get a random API key from available keys"""
@@ -16,6 +18,21 @@ class AIAPIHandler:
             return random.choice(available_keys)
         return None
 
+    def mark_failed_key(self, api_key, status_code):
+        """Stop using a key after an auth error, or after a rate limit unless those are retried"""
+        if status_code in (401, 403) or (status_code == 429 and not self.retry_rate_limits):
+            self.disable_key(api_key)
+
+    def disable_key(self, api_key):
+        """Stop using a key for the rest of the run"""
+        self.failed_keys.add(api_key)
+        self.main_window.log_message(f"API key marked as failed: {api_key[:10]}...")
+
+    @staticmethod
+    def is_rate_limited(error_msg):
+        """Whether an error returned by a call_*_api method was an HTTP 429"""
+        return bool(error_msg) and "Status: 429," in error_msg
+
     def call_gemini_api(self, prompt, model_name, config, api_keys):
         """Call Google Gemini API"""
         api_key = self.get_random_api_key(api_keys)
@@ -55,9 +72,7 @@ class AIAPIHandler:
             else:
                 error_msg = f"Gemini API error - Status: {response.status_code}, Response: {response.text}"
                 self.main_window.log_message(f"Error: {error_msg}")
-                if response.status_code in [401, 403, 429]:
-                    self.failed_keys.add(api_key)
-                    self.main_window.log_message(f"API key marked as failed: {api_key[:10]}...")
+                self.mark_failed_key(api_key, response.status_code)
                 return None, error_msg
                 
         except requests.exceptions.Timeout:
@@ -109,9 +124,7 @@ class AIAPIHandler:
             else:
                 error_msg = f"ChatGPT API error - Status: {response.status_code}, Response: {response.text}"
                 self.main_window.log_message(f"Error: {error_msg}")
-                if response.status_code in [401, 403, 429]:
-                    self.failed_keys.add(api_key)
-                    self.main_window.log_message(f"API key marked as failed: {api_key[:10]}...")
+                self.mark_failed_key(api_key, response.status_code)
                 return None, error_msg
                 
         except requests.exceptions.Timeout:
@@ -164,9 +177,7 @@ class AIAPIHandler:
             else:
                 error_msg = f"Claude API error - Status: {response.status_code}, Response: {response.text}"
                 self.main_window.log_message(f"Error: {error_msg}")
-                if response.status_code in [401, 403, 429]:
-                    self.failed_keys.add(api_key)
-                    self.main_window.log_message(f"API key marked as failed: {api_key[:10]}...")
+                self.mark_failed_key(api_key, response.status_code)
                 return None, error_msg
                 
         except requests.exceptions.Timeout:
@@ -218,9 +229,7 @@ class AIAPIHandler:
             else:
                 error_msg = f"Grok API error - Status: {response.status_code}, Response: {response.text}"
                 self.main_window.log_message(f"Error: {error_msg}")
-                if response.status_code in [401, 403, 429]:
-                    self.failed_keys.add(api_key)
-                    self.main_window.log_message(f"API key marked as failed: {api_key[:10]}...")
+                self.mark_failed_key(api_key, response.status_code)
                 return None, error_msg
                 
         except requests.exceptions.Timeout:
@@ -1,14 +1,39 @@
+import os
 import pyautogui
 import random
 import time
+from functools import lru_cache
 from typing import Tuple, Optional
-from helper.recognizer import match_template
+import numpy as np
+from helper.recognizer import match_template, grab_screen, load_template
+from helper.fast_click import win_click
+
+# Screen size looked up once; call refresh_screen_size() if the display layout changes
+_SCREEN = tuple(pyautogui.size())
+
+@lru_cache(maxsize=128)
+def _image_name(img_path: str) -> str:
+    """Image file name without directory or extension, for log messages"""
+    return os.path.splitext(os.path.basename(img_path))[0]
+
+def screen_size() -> Tuple[int, int]:
+    """Cached (width, height) of the screen"""
+    return _SCREEN
+
+def refresh_screen_size() -> Tuple[int, int]:
+    """Re-read the screen size (e.g. after a monitor is plugged or unplugged)"""
+    global _SCREEN
+    _SCREEN = tuple(pyautogui.size())
+    return _SCREEN
 
 def find_and_click(img_path: str, region: Optional[Tuple[int, int, int, int]] = None,
                    max_attempts: int = 1, delay_between: float = 1.0,
                    click: bool = True, confidence: float = 0.8, log_attempts: bool = True,
                    use_random: bool = False, return_all_coords: bool = False,
-                   check_stop_func=None, log_func=None):
+                   check_stop_func=None, log_func=None,
+                   screenshot: Optional[np.ndarray] = None,
+                   warmup: float = 0.0,
+                   move_duration: float = 0.0) -> Optional[Tuple[int, ...]]:
     """
     Find and optionally click an image on screen with random clicking support
 
@@ -24,12 +49,17 @@ def find_and_click(img_path: str, region: Optional[Tuple[int, int, int, int]] =
         return_all_coords: Whether to return all 6 coordinates (left, top, right, bottom, center_x, center_y)
         check_stop_func: Function to check if should stop
         log_func: Function to log messages
+        screenshot: Optional BGR capture of region (see grab_screen), used for the first attempt
+        warmup: Seconds to wait before the first attempt (for UI that is still settling)
+        move_duration: Seconds to tween the mouse to the target before clicking
+            (0 clicks directly, through SendInput on Windows)
 
     Returns:
         If return_all_coords is True: Tuple of (left, top, right, bottom, center_x, center_y)
         Otherwise: Tuple of (x, y) coordinates if found, None otherwise
     """
-    time.sleep(1)
+    if warmup > 0:
+        time.sleep(warmup)
 
     # Check stop condition before starting
     if check_stop_func and check_stop_func():
@@ -37,11 +67,18 @@ def find_and_click(img_path: str, region: Optional[Tuple[int, int, int, int]] =
 
     # Set default region to full screen if not provided
     if not region:
-        screen_width, screen_height = pyautogui.size()
+        screen_width, screen_height = _SCREEN
         region = (0, 0, screen_width, screen_height)
 
     # Extract filename for logging
-    filename = img_path.split('/')[-1].replace('.png', '')
+    filename = _image_name(img_path)
+
+    # Decode the template once (cached per path) rather than on every attempt
+    try:
+        template = load_template(img_path)
+    except Exception:
+        # Let match_template report the load failure
+        template = img_path
 
     for attempt in range(max_attempts):
         # Check stop condition before each attempt
@@ -49,8 +86,9 @@ def find_and_click(img_path: str, region: Optional[Tuple[int, int, int, int]] =
             return None
 
         try:
-            # Try to locate the image
-            boxes = match_template(img_path, threshold=confidence, region=region)
+            # Try to locate the image; a passed-in screenshot is only fresh for the first attempt
+            screen = screenshot if attempt == 0 else None
+            boxes = match_template(template, threshold=confidence, region=region, screen=screen)
 
             # Check if any matches found
             if boxes and len(boxes) > 0:
@@ -80,9 +118,12 @@ def find_and_click(img_path: str, region: Optional[Tuple[int, int, int, int]] =
                     if check_stop_func and check_stop_func():
                         return None
 
-                    # Click at calculated position
-                    pyautogui.moveTo(click_x, click_y, duration=0.175)
-                    pyautogui.click()
+                    # Click at calculated position, optionally gliding there first
+                    if move_duration > 0:
+                        pyautogui.moveTo(click_x, click_y, duration=move_duration)
+                        pyautogui.click()
+                    elif not win_click(click_x, click_y):
+                        pyautogui.click(click_x, click_y)
                     if log_func:
                         log_func(f"Clicked {filename}")
 
@@ -119,6 +160,13 @@ def find_and_click(img_path: str, region: Optional[Tuple[int, int, int, int]] =
 
     return None
 
+def _grab_screen_or_none() -> Optional[np.ndarray]:
+    """Full-screen capture for find_and_click, or None to let it grab its own"""
+    try:
+        return grab_screen()
+    except Exception:
+        return None
+
 def ensure_scroll_to_bottom(max_attempts: int = 5, find_indicator: Optional[Tuple[str, float]] = None,
                             check_stop_func=None, log_func=None):
     """
@@ -133,7 +181,7 @@ def ensure_scroll_to_bottom(max_attempts: int = 5, find_indicator: Optional[Tupl
     Returns:
         Coordinates (x, y) of indicator if found, True if scrolled (no indicator), False if failed
     """
-    screen_width, screen_height = pyautogui.size()
+    screen_width, screen_height = _SCREEN
 
     for attempt in range(max_attempts):
         # Check stop condition
@@ -168,7 +216,8 @@ def ensure_scroll_to_bottom(max_attempts: int = 5, find_indicator: Optional[Tupl
                     max_attempts=1,
                     confidence=confidence,
                     log_func=None,
-                    check_stop_func=check_stop_func
+                    check_stop_func=check_stop_func,
+                    screenshot=_grab_screen_or_none()
                 )
                 if result:
                     if log_func:
@@ -195,7 +244,8 @@ def ensure_scroll_to_bottom(max_attempts: int = 5, find_indicator: Optional[Tupl
                 delay_between=0.5,
                 confidence=confidence,
                 log_func=None,
-                check_stop_func=check_stop_func
+                check_stop_func=check_stop_func,
+                screenshot=_grab_screen_or_none()
             )
             if result:
                 if log_func:
@@ -0,0 +1,56 @@
+import sys
+
+# Direct Win32 clicks; pyautogui is used everywhere else (and on other platforms)
+AVAILABLE = sys.platform == 'win32'
+
+if AVAILABLE:
+    import ctypes
+    from ctypes import wintypes
+
+    INPUT_MOUSE = 0
+    MOUSEEVENTF_LEFTDOWN = 0x0002
+    MOUSEEVENTF_LEFTUP = 0x0004
+
+    class MOUSEINPUT(ctypes.Structure):
+        _fields_ = [
+            ('dx', wintypes.LONG),
+            ('dy', wintypes.LONG),
+            ('mouseData', wintypes.DWORD),
+            ('dwFlags', wintypes.DWORD),
+            ('time', wintypes.DWORD),
+            ('dwExtraInfo', ctypes.c_size_t),
+        ]
+
+    class _INPUTUNION(ctypes.Union):
+        # MOUSEINPUT is the largest member, so the union has the size Windows expects
+        _fields_ = [('mi', MOUSEINPUT)]
+
+    class INPUT(ctypes.Structure):
+        _anonymous_ = ('u',)
+        _fields_ = [('type', wintypes.DWORD), ('u', _INPUTUNION)]
+
+    _user32 = ctypes.windll.user32
+    _user32.SendInput.argtypes = (wintypes.UINT, ctypes.POINTER(INPUT), ctypes.c_int)
+    _user32.SendInput.restype = wintypes.UINT
+    _user32.SetCursorPos.argtypes = (ctypes.c_int, ctypes.c_int)
+    _user32.SetCursorPos.restype = wintypes.BOOL
+
+    # Button down + up, built once and sent with a single SendInput call
+    _CLICK = (INPUT * 2)(
+        INPUT(type=INPUT_MOUSE, mi=MOUSEINPUT(dwFlags=MOUSEEVENTF_LEFTDOWN)),
+        INPUT(type=INPUT_MOUSE, mi=MOUSEINPUT(dwFlags=MOUSEEVENTF_LEFTUP)),
+    )
+
+
+def win_click(x: int, y: int) -> bool:
+    """Left-click at screen (x, y) via SetCursorPos + SendInput; False if not sent"""
+    if not AVAILABLE:
+        return False
+    try:
+        # SetCursorPos uses the same pixel coordinates as pyautogui
+        if not _user32.SetCursorPos(int(x), int(y)):
+            return False
+        return _user32.SendInput(2, _CLICK, ctypes.sizeof(INPUT)) == 2
+    except Exception as e:
+        print(f"Fast click error: {e}")
+        return False
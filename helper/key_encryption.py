@@ -1,6 +1,7 @@
 import base64
 import json
 import os
+from typing import Iterable, List, Optional
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
@@ -8,10 +9,18 @@ from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 
 class KeyEncryption:
     """Handle encryption and decryption of API keys"""
-    
+
+    # Tag marking encrypted values, so they can be recognised without a trial decrypt
+    ENC_PREFIX = "enc:"
+
+    # Fernet cipher shared by all instances - key store is read (or derived) only once per process
+    _shared_cipher: Optional[Fernet] = None
+
     def __init__(self):
         self.key_file = ".key_store"
-        self.cipher = self._get_or_create_cipher()
+        if KeyEncryption._shared_cipher is None:
+            KeyEncryption._shared_cipher = self._get_or_create_cipher()
+        self.cipher = KeyEncryption._shared_cipher
     
     def _get_or_create_cipher(self):
         """Get existing cipher or create new one"""
@@ -48,65 +57,71 @@ class KeyEncryption:
         key = base64.urlsafe_b64encode(kdf.derive(machine_id.encode()))
         return key
     
-    def encrypt_keys_list(self, keys_list):
-        """Encrypt a list of API keys"""
-        if not keys_list:
+    def encrypt_keys_list(self, keys_list: Optional[Iterable[str]]) -> List[str]:
+        """Encrypt a list of API keys as a single token (one-element list)"""
+        keys = [key for key in keys_list or () if key]  # Only encrypt non-empty keys
+        if not keys:
             return []
-        encrypted_list = []
-        for key in keys_list:
-            if key:  # Only encrypt non-empty keys
-                encrypted = self.encrypt_key(key)
-                encrypted_list.append(encrypted)
-        return encrypted_list
+        try:
+            encrypted = self.cipher.encrypt(json.dumps(keys).encode())
+            return [self.ENC_PREFIX + base64.urlsafe_b64encode(encrypted).decode()]
+        except Exception as e:
+            print(f"Encryption error: {e}")
+            return keys
 
-    def decrypt_keys_list(self, encrypted_list):
-        """Decrypt a list of API keys"""
-        if not encrypted_list:
-            return []
-        decrypted_list = []
-        for encrypted_key in encrypted_list:
-            if encrypted_key:  # Only decrypt non-empty keys
-                decrypted = self.decrypt_key(encrypted_key)
-                decrypted_list.append(decrypted)
-        return decrypted_list
+    def decrypt_keys_list(self, encrypted_list: Optional[Iterable[str]]) -> List[str]:
+        """Decrypt a list of API keys (single-token list or legacy one-token-per-key list)"""
+        tokens = [token for token in encrypted_list or () if token]  # Only decrypt non-empty keys
+        if len(tokens) == 1:
+            try:
+                decrypted = self._decrypt_token(tokens[0])
+            except Exception:
+                decrypted = None
+            if decrypted is not None:
+                try:
+                    keys = json.loads(decrypted)
+                except ValueError:
+                    keys = None
+                if isinstance(keys, list):
+                    return [str(key) for key in keys if key]
+                # Legacy token holding a single key
+                return [decrypted]
+        return [self.decrypt_key(token) for token in tokens]
 
-    def encrypt_key(self, api_key):
+    def encrypt_key(self, api_key: str) -> str:
         """Encrypt a single API key"""
         if not api_key:
             return ""
+        # Already encrypted
+        if api_key.startswith(self.ENC_PREFIX):
+            return api_key
         try:
-            # Check if already encrypted by trying to decrypt
-            try:
-                decoded = base64.urlsafe_b64decode(api_key.encode())
-                self.cipher.decrypt(decoded)
-                # If decrypt successful, already encrypted
-                return api_key
-            except:
-                # Not encrypted, proceed to encrypt
-                pass
-
             # Encrypt the key
             encrypted = self.cipher.encrypt(api_key.encode())
-            return base64.urlsafe_b64encode(encrypted).decode()
+            return self.ENC_PREFIX + base64.urlsafe_b64encode(encrypted).decode()
         except Exception as e:
             print(f"Encryption error: {e}")
             return api_key
 
-    def decrypt_key(self, encrypted_key):
+    def decrypt_key(self, encrypted_key: str) -> str:
         """Decrypt a single API key"""
         if not encrypted_key:
             return ""
         try:
             # Try to decrypt
-            decoded = base64.urlsafe_b64decode(encrypted_key.encode())
-            decrypted = self.cipher.decrypt(decoded)
-            return decrypted.decode()
+            return self._decrypt_token(encrypted_key)
         except Exception as e:
             # If decryption fails, might be plain text
             print(f"Decryption warning: Key might be plain text")
             return encrypted_key
     
-    def mask_key_for_display(self, api_key):
+    def _decrypt_token(self, token: str) -> str:
+        """Decrypt a stored value, with or without the enc: tag (older files have none)"""
+        if token.startswith(self.ENC_PREFIX):
+            token = token[len(self.ENC_PREFIX):]
+        return self.cipher.decrypt(base64.urlsafe_b64decode(token.encode())).decode()
+
+    def mask_key_for_display(self, api_key: str) -> str:
         """Mask API key for display (show first 6 and last 4 characters)"""
         if len(api_key) <= 10:
             return "*" * len(api_key)
@@ -1,39 +1,178 @@
 import os
 import re
 import csv
-import glob
+import codecs
+import itertools
+from collections import Counter
 from pathlib import Path
 from docx import Document
 from docx.opc.exceptions import PackageNotFoundError
 import zipfile
 import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
 from urllib.parse import unquote
 import html
-import re
-import pandas as pd
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+try:
+    from charset_normalizer import from_bytes as _detect_charset
+except ImportError:
+    _detect_charset = None
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+# Patterns compiled once at import; the HTML pipeline runs them for every chapter/line
+_NAT_SPLIT = re.compile(r'(\d+)')
+_DATA_DIR_RE = re.compile(r'(.*?[/\\]Data[/\\])')
+
+_HIRAGANA_RE = re.compile(r'^[\u3040-\u309F]+$')
+_KATAKANA_RE = re.compile(r'^[\u30A0-\u30FF]+$')
+
+_CLEAN_BR_RE = re.compile(r'<br\s*/?>')
+_CLEAN_P_OPEN_RE = re.compile(r'<p[^>]*>')
+_CLEAN_P_CLOSE_RE = re.compile(r'</p>')
+
+# CSS line patterns, grouped by the character they cannot match without
+_CSS_BRACE_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r'^\s*[a-zA-Z#\.\[\]]+\s*\{\s*[^}]*\}\s*$',
+    r'^\s*@[a-zA-Z\-]+\s*[^{]*\{\s*[^}]*\}\s*$',
+    r'.*\{\s*(padding|margin|text-align|display|list-style)[^}]*\}',
+)]
+_CSS_COLON_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r'^\s*[a-zA-Z\-]+\s*:\s*[^;]+;\s*$',
+    r'^\s*[a-zA-Z\-]+\s*:\s*[^;]+\s*$',
+)]
+_CSS_KEYWORDS = ('padding', 'margin', 'text-align', 'display', 'font-size',
+                 'color', 'background', 'border', 'width', 'height', 'position',
+                 'float', 'clear', 'list-style-type', 'nav#landmarks')
+# Searched on the lower-cased line
+_CSS_KEYWORDS_RE = re.compile('|'.join(map(re.escape, _CSS_KEYWORDS)))
+
+_HEX_ENTITY_RE = re.compile(r'&#x([0-9A-Fa-f]{4,6});')
+
+_RUBY_BLOCK_RE = re.compile(r'<ruby>(.*?)</ruby>', re.DOTALL)
+_RUBY_SIMPLE_RE = re.compile(r'<ruby>([^<]+)<rt>([^<]*)</rt></ruby>')
+_RUBY_OPEN_TAG_RE = re.compile(r'<r[ubt]>')
+_RB_RT_PAIR_RE = re.compile(r'<rb>(.*?)</rb>\s*<rt>(.*?)</rt>', re.DOTALL)
+_RB_RE = re.compile(r'<rb>(.*?)</rb>', re.DOTALL)
+_RT_RE = re.compile(r'<rt>(.*?)</rt>', re.DOTALL)
+# Modes that rewrite ruby as base(reading); remove_all just keeps the text
+_RUBY_FORMAT_MODES = frozenset({'remove_hiragana', 'keep_all'})
+
+# Regex extraction: everything that is dropped (doctype, xml declaration, comments,
+# style and script blocks) in one alternation, then images and line boundaries in another
+_NOISE_RE = re.compile(
+    r'<!DOCTYPE[^>]*>|<\?xml[^>]*\?>|<!--.*?-->'
+    r'|<style[^>]*>.*?</style>|<script[^>]*>.*?</script>',
+    re.DOTALL | re.IGNORECASE)
+_BOUNDARY_RE = re.compile(
+    r'(?P<img><img[^>]*>)|<br\s*/?>|</p>\s*<p[^>]*>|</div>\s*<div[^>]*>',
+    re.IGNORECASE)
+_TAG_RE = re.compile(r'<[^>]+>')
+
+# lxml extraction: elements that start a new line, and subtrees that are never text
+_BLOCK_TAGS = frozenset({'p', 'div', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+                         'li', 'tr', 'blockquote', 'title'})
+_SKIP_TAGS = frozenset({'style', 'script'})
+
+# Encoding detection looks at this much of the file
+_ENCODING_SAMPLE_SIZE = 1 << 16
+# Candidate encodings tried in order when there is no BOM (UTF-16 is recognised by its BOM;
+# BOM-less UTF-16 would "decode" almost any even-length byte string)
+_ENCODINGS = ('utf-8', 'gb18030', 'gbk', 'big5', 'shift-jis', 'euc-jp', 'euc-kr')
+# The utf-32 BOM starts with the utf-16-le one, so it is checked first
+_BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+# File types converted in folder mode
+_SUPPORTED_EXTS = frozenset({'.txt', '.docx', '.epub'})
+
+# Below this many chapters/files the work stays in this process (pool start-up costs more)
+_MIN_PARALLEL_ITEMS = 8
+
+
+def _map_in_processes(func, items, *args):
+    """
+    Map func(item, *args) over items across CPU cores, keeping order; serial for small inputs
+    """
+    count = len(items)
+    workers = min(os.cpu_count() or 1, count)
+    if not _use_processes(count):
+        return [func(item, *args) for item in items]
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(func, items, *[[arg] * count for arg in args],
+                                     chunksize=max(1, count // (workers * 4))))
+    except Exception:
+        # Process pool unavailable here - do the work in this process instead
+        return [func(item, *args) for item in items]
+
+def _use_processes(count):
+    """
+    Whether _map_in_processes would spread this many items over worker processes
+    """
+    return count >= _MIN_PARALLEL_ITEMS and min(os.cpu_count() or 1, count) >= 2
+
 
 def natural_sort_key(s):
     """
     Sort file names naturally by numbers
     """
     return [int(text) if text.isdigit() else text.lower()
-            for text in re.split(r'(\d+)', s)]
+            for text in _NAT_SPLIT.split(s)]
 
 
 def detect_encoding(file_path):
     """
-    Detect file encoding
+    Detect file encoding from a BOM or a sample of the file
     """
-    encodings = ['utf-8', 'utf-16', 'utf-16-le', 'utf-16-be', 'gb18030', 'gbk', 'big5', 'shift-jis', 'euc-jp', 'euc-kr']
-    for encoding in encodings:
-        try:
-            with open(file_path, 'r', encoding=encoding) as f:
-                content = f.read()
-                return encoding
-        except UnicodeDecodeError:
-            continue
+    try:
+        with open(file_path, 'rb') as f:
+            sample = f.read(_ENCODING_SAMPLE_SIZE)
+    except OSError:
+        return 'utf-8'
+
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+
+    # The sample may end mid-character unless it is the whole file
+    final = len(sample) < _ENCODING_SAMPLE_SIZE
+    if _decodes(sample, _ENCODINGS[0], final):
+        return _ENCODINGS[0]
+
+    if _detect_charset is not None:
+        best = _detect_charset(sample).best()
+        if best is not None and best.encoding:
+            return best.encoding
+
+    for encoding in _ENCODINGS[1:]:
+        if _decodes(sample, encoding, final):
+            return encoding
     return 'utf-8'
 
+def _decodes(sample, encoding, final):
+    """
+    Check whether a byte sample is valid in an encoding
+    """
+    try:
+        codecs.getincrementaldecoder(encoding)().decode(sample, final)
+        return True
+    except UnicodeError:
+        return False
+
 
 def read_txt_content(file_path):
     """
@@ -42,8 +181,9 @@ def read_txt_content(file_path):
     try:
         encoding = detect_encoding(file_path)
         with open(file_path, 'r', encoding=encoding, errors='ignore') as file:
+            # Text mode already reads \r\n and \r as \n (universal newlines);
+            # replace() returns the string itself when there is nothing to replace
             content = file.read()
-            content = content.replace('\r\n', '\n').replace('\r', '\n')
             content = content.replace('\u2028', '\n').replace('\u2029', '\n')
             return content.split('\n')
     except Exception as e:
@@ -61,11 +201,15 @@ def read_docx_content(file_path):
             text = para.text.strip()
             if text:
                 paragraphs.append(text)
+        # Table cells are skipped when their text is already in the output
+        # (merged cells repeat in every row/column they span)
+        seen = set(paragraphs)
         for table in doc.tables:
             for row in table.rows:
                 for cell in row.cells:
                     text = cell.text.strip()
-                    if text and text not in paragraphs:
+                    if text and text not in seen:
+                        seen.add(text)
                         paragraphs.append(text)
         return paragraphs
     except PackageNotFoundError:
@@ -137,10 +281,10 @@ def clean_html_text(text):
     """
     Clean HTML text and remove tags
     """
-    text = re.sub(r'<br\s*/?>', '\n', text)
-    text = re.sub(r'<p[^>]*>', '\n', text)
-    text = re.sub(r'</p>', '', text)
-    text = re.sub(r'<[^>]+>', '', text)
+    text = _CLEAN_BR_RE.sub('\n', text)
+    text = _CLEAN_P_OPEN_RE.sub('\n', text)
+    text = _CLEAN_P_CLOSE_RE.sub('', text)
+    text = _TAG_RE.sub('', text)
     text = html.unescape(text)
     text = text.strip()
     return text
@@ -158,8 +302,7 @@ def generate_output_path(input_path, language):
     else:
         output_filename = f"{input_name}_{language}.csv"
 
-    data_dir_pattern = r'(.*?[/\\]Data[/\\])'
-    match = re.search(data_dir_pattern, input_path)
+    match = _DATA_DIR_RE.search(input_path)
 
     if match:
         data_dir = match.group(1)
@@ -175,37 +318,48 @@ def generate_output_path(input_path, language):
 
 def save_to_file(all_rows, output_path, log_callback=None):
     """
-    Save rows to CSV or Excel based on file extension
+    Save rows to CSV or Excel based on file extension (rows may be any iterable)
     """
-    if not all_rows:
+    rows = iter(all_rows)
+    first_row = next(rows, None)
+    if first_row is None:
         if log_callback:
             log_callback("No content to write")
         return False
 
     try:
-        # Create DataFrame
-        df = pd.DataFrame(all_rows, columns=['id', 'text'])
-
         # Check output format by extension
         _, ext = os.path.splitext(output_path)
         ext = ext.lower()
 
         if ext == '.xlsx' or ext == '.xls':
             # Save as Excel
-            df.to_excel(output_path, index=False, engine='openpyxl')
+            if xlsxwriter is not None:
+                row_count = _write_xlsx_rows(output_path, itertools.chain((first_row,), rows))
+            else:
+                # openpyxl needs the whole table, so only this path builds a DataFrame
+                import pandas as pd
+                all_rows = [first_row]
+                all_rows.extend(rows)
+                row_count = len(all_rows)
+                df = pd.DataFrame(all_rows, columns=['id', 'text'])
+                df.to_excel(output_path, index=False, engine='openpyxl')
             if log_callback:
                 log_callback(f"Saved as Excel file: {output_path}")
         else:
-            # Save as CSV (default)
+            # Save as CSV (default), writing rows as they are produced
             with open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
                 csv_writer = csv.writer(csvfile)
                 csv_writer.writerow(['id', 'text'])
-                csv_writer.writerows(all_rows)
+                csv_writer.writerow(first_row)
+                row_count = 1
+                for row_count, row in enumerate(rows, 2):
+                    csv_writer.writerow(row)
             if log_callback:
                 log_callback(f"Saved as CSV file: {output_path}")
 
         if log_callback:
-            log_callback(f"Processing completed! Total lines: {len(all_rows)}")
+            log_callback(f"Processing completed! Total lines: {row_count}")
 
         return True
     except Exception as e:
@@ -213,6 +367,22 @@ def save_to_file(all_rows, output_path, log_callback=None):
             log_callback(f"Error writing file: {str(e)}")
         return False
 
+def _write_xlsx_rows(output_path, rows):
+    """
+    Stream (id, text) rows into an xlsx file with xlsxwriter; returns the row count
+    """
+    # constant_memory flushes each row to disk as soon as the next one starts
+    options = {'constant_memory': True, 'strings_to_urls': False}
+    row_count = 0
+    with xlsxwriter.Workbook(output_path, options) as workbook:
+        worksheet = workbook.add_worksheet()
+        worksheet.write_row(0, 0, ('id', 'text'))
+        for row_count, (row_id, text) in enumerate(rows, 1):
+            worksheet.write_number(row_count, 0, row_id)
+            # Always text - lines starting with '=' must not become formulas
+            worksheet.write_string(row_count, 1, text)
+    return row_count
+
 def convert_to_csv(input_path, language, output_path=None, ruby_handling=None, log_callback=None):
     """
     Convert file or folder to CSV/Excel with id and text columns
@@ -242,64 +412,114 @@ def convert_to_csv(input_path, language, output_path=None, ruby_handling=None, l
         log_callback(f"Output will be saved to: {output_path}")
 
     if os.path.isdir(input_path):
-        all_rows = process_folder_to_csv(input_path, language, ruby_handling, log_callback)
+        all_files = find_folder_files(input_path, log_callback)
     else:
-        all_rows, _ = process_file_to_csv(input_path, language, 1, ruby_handling, log_callback)
+        all_files = [input_path]
 
-    # Use new save function that supports both CSV and Excel
-    success = save_to_file(all_rows, output_path, log_callback)
+    # Rows are streamed straight into the output file rather than collected first
+    success = save_to_file(iter_rows(all_files, ruby_handling, log_callback), output_path, log_callback)
 
     if success:
         return True, output_path
     else:
         return False, None
 
+def read_file_lines(file_path, ruby_handling=None, parallel=True):
+    """
+    Read the text lines of a TXT/DOCX/EPUB file, or None if the format is unsupported
+    """
+    file_ext = os.path.splitext(file_path)[1].lower()
+    if file_ext == '.txt':
+        return read_txt_content(file_path)
+    if file_ext == '.docx':
+        return read_docx_content(file_path)
+    if file_ext == '.epub':
+        return read_epub_content(file_path, ruby_handling, parallel)
+    return None
+
+def _read_file_lines_worker(file_path, ruby_handling):
+    """
+    Process pool entry point: read one file without starting a nested pool
+    """
+    return read_file_lines(file_path, ruby_handling, parallel=False)
+
+def iter_file_rows(lines, current_id=1):
+    """
+    Iterate (id, text) for each non-empty stripped line, numbering from current_id
+    """
+    # strip, filter and numbering all run in C - no per-line Python bytecode
+    return zip(itertools.count(current_id), filter(None, map(str.strip, lines)))
+
+def iter_rows(all_files, ruby_handling=None, log_callback=None):
+    """
+    Yield numbered (id, text) rows for the given files in order
+    """
+    # Enough independent files to pay for a process pool: read them in parallel up front,
+    # then number in file order. Otherwise read each file lazily so only one is held in memory
+    file_lines = None
+    if _use_processes(len(all_files)):
+        file_lines = _map_in_processes(_read_file_lines_worker, all_files, ruby_handling)
+
+    current_id = 1
+    for index, file_path in enumerate(all_files):
+        if log_callback:
+            log_callback(f"Processing file: {os.path.basename(file_path)}")
+
+        if file_lines is not None:
+            lines = file_lines[index]
+        else:
+            lines = read_file_lines(file_path, ruby_handling)
+        if lines is None:
+            if log_callback:
+                log_callback(f"Unsupported file format: {os.path.splitext(file_path)[1].lower()}")
+            continue
+
+        rows = list(iter_file_rows(lines, current_id))
+        current_id += len(rows)
+        yield from rows
+
+        if log_callback:
+            log_callback(f"Processed {len(rows)} lines from file")
+
 def process_file_to_csv(file_path, language, current_id=1, ruby_handling=None, log_callback=None):
     """
     Process a single file and return list of rows
     """
     file_ext = os.path.splitext(file_path)[1].lower()
-    file_name = os.path.basename(file_path)
 
     if log_callback:
-        log_callback(f"Processing file: {file_name}")
+        log_callback(f"Processing file: {os.path.basename(file_path)}")
 
-    if file_ext == '.txt':
-        lines = read_txt_content(file_path)
-    elif file_ext == '.docx':
-        lines = read_docx_content(file_path)
-    elif file_ext == '.epub':
-        lines = read_epub_content(file_path, ruby_handling)
-    else:
+    lines = read_file_lines(file_path, ruby_handling)
+    if lines is None:
         if log_callback:
             log_callback(f"Unsupported file format: {file_ext}")
         return [], current_id
 
-    rows = []
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-        rows.append([current_id, line])
-        current_id += 1
+    rows = list(iter_file_rows(lines, current_id))
+    current_id += len(rows)
 
     if log_callback:
         log_callback(f"Processed {len(rows)} lines from file")
 
     return rows, current_id
 
-def process_folder_to_csv(folder_path, language, ruby_handling=None, log_callback=None):
+def find_folder_files(folder_path, log_callback=None):
     """
-    Process all supported files in folder
+    List supported files in folder, naturally sorted by name
     """
     if log_callback:
         log_callback(f"Searching for files in folder: {folder_path}")
 
-    txt_files = glob.glob(os.path.join(folder_path, "*.txt"))
-    docx_files = glob.glob(os.path.join(folder_path, "*.docx"))
-    epub_files = glob.glob(os.path.join(folder_path, "*.epub"))
-
-    all_files = txt_files + docx_files + epub_files
+    # One directory scan for all supported types (hidden files skipped, as glob did)
+    all_files = []
+    counts = Counter()
+    with os.scandir(folder_path) as entries:
+        for entry in entries:
+            ext = os.path.splitext(entry.name)[1].lower()
+            if ext in _SUPPORTED_EXTS and not entry.name.startswith('.') and entry.is_file():
+                all_files.append(entry.path)
+                counts[ext] += 1
 
     if not all_files:
         if log_callback:
@@ -309,18 +529,18 @@ def process_folder_to_csv(folder_path, language, ruby_handling=None, log_callbac
     all_files.sort(key=lambda x: natural_sort_key(os.path.basename(x)))
 
     if log_callback:
-        log_callback(f"Found {len(all_files)} file(s): TXT={len(txt_files)}, DOCX={len(docx_files)}, EPUB={len(epub_files)}")
-
-    all_rows = []
-    current_id = 1
+        log_callback(f"Found {len(all_files)} file(s): TXT={counts['.txt']}, DOCX={counts['.docx']}, EPUB={counts['.epub']}")
 
-    for file_path in all_files:
-        rows, current_id = process_file_to_csv(file_path, language, current_id, ruby_handling, log_callback)
-        all_rows.extend(rows)
+    return all_files
 
-    return all_rows
+def process_folder_to_csv(folder_path, language, ruby_handling=None, log_callback=None):
+    """
+    Process all supported files in folder
+    """
+    all_files = find_folder_files(folder_path, log_callback)
+    return list(iter_rows(all_files, ruby_handling, log_callback))
 
-def read_epub_content(file_path, ruby_handling=None):
+def read_epub_content(file_path, ruby_handling=None, parallel=True):
     """
     Read EPUB file content with advanced HTML processing and image position tracking
     """
@@ -336,6 +556,12 @@ def read_epub_content(file_path, ruby_handling=None):
                 ordered_files = parse_opf_spine(epub_zip, opf_path)
                 html_files = []
 
+                # Index the archive once so each spine entry resolves in O(1)
+                name_set = set(file_list)
+                basename_index = {}
+                for f in file_list:
+                    basename_index.setdefault(os.path.basename(f), []).append(f)
+
                 for file_path_in_epub in ordered_files:
                     candidates = [
                         file_path_in_epub,
@@ -345,13 +571,13 @@ def read_epub_content(file_path, ruby_handling=None):
                     ]
 
                     for candidate in candidates:
-                        if candidate in file_list:
+                        if candidate in name_set:
                             html_files.append(candidate)
                             break
                     else:
                         basename = os.path.basename(file_path_in_epub)
-                        for f in file_list:
-                            if os.path.basename(f) == basename and f.endswith(('.html', '.xhtml', '.htm')):
+                        for f in basename_index.get(basename, ()):
+                            if f.endswith(('.html', '.xhtml', '.htm')):
                                 html_files.append(f)
                                 break
             else:
@@ -360,60 +586,71 @@ def read_epub_content(file_path, ruby_handling=None):
                               and not f.startswith('__MACOSX')]
                 html_files.sort(key=natural_sort_key)
 
+            # Worker processes need every chapter up front; otherwise each chapter is
+            # extracted right after it is decompressed, so only one is held in memory
+            parallel = parallel and _use_processes(len(html_files))
+            payloads = []
             for html_file in html_files:
                 try:
                     content = epub_zip.read(html_file)
-
-                    if isinstance(content, bytes):
-                        content = content.decode('utf-8', errors='replace')
-
-                    extracted_lines = extract_content_from_html(content, ruby_handling)
-                    paragraphs.extend(extracted_lines)
-
                 except Exception:
                     continue
+                if parallel:
+                    payloads.append(content)
+                else:
+                    paragraphs.extend(_extract_chapter(content, ruby_handling))
+
+        # Chapters are parsed independently, so spread them over worker processes
+        if payloads:
+            for extracted_lines in _map_in_processes(_extract_chapter, payloads, ruby_handling):
+                paragraphs.extend(extracted_lines)
 
         return paragraphs
 
     except Exception:
         return []
 
+def _extract_chapter(content, ruby_handling):
+    """
+    Extract one chapter's lines (process pool entry point); a broken chapter yields no lines
+    """
+    try:
+        return extract_content_from_html(content, ruby_handling)
+    except Exception:
+        return []
+
 def is_hiragana(text):
     """
     Check if text is hiragana
     """
-    return bool(re.match(r'^[\u3040-\u309F]+$', text))
+    return bool(_HIRAGANA_RE.match(text))
 
 def is_katakana(text):
     """
     Check if text is katakana
     """
-    return bool(re.match(r'^[\u30A0-\u30FF]+$', text))
+    return bool(_KATAKANA_RE.match(text))
 
 def is_css_content(text):
     """
     Check if text is CSS/style content
     """
-    css_patterns = [
-        r'^\s*[a-zA-Z#\.\[\]]+\s*\{\s*[^}]*\}\s*$',
-        r'^\s*[a-zA-Z\-]+\s*:\s*[^;]+;\s*$',
-        r'^\s*@[a-zA-Z\-]+\s*[^{]*\{\s*[^}]*\}\s*$',
-        r'^\s*[a-zA-Z\-]+\s*:\s*[^;]+\s*$',
-        r'.*\{\s*(padding|margin|text-align|display|list-style)[^}]*\}',
-    ]
-
-    for pattern in css_patterns:
-        if re.search(pattern, text, re.IGNORECASE):
-            return True
+    if '{' in text:
+        for pattern in _CSS_BRACE_PATTERNS:
+            if pattern.search(text):
+                return True
 
-    css_keywords = ['padding', 'margin', 'text-align', 'display', 'font-size',
-                    'color', 'background', 'border', 'width', 'height', 'position',
-                    'float', 'clear', 'list-style-type', 'nav#landmarks']
+    # Everything below needs a colon, which ordinary narrative lines rarely have
+    if ':' not in text:
+        return False
 
-    for keyword in css_keywords:
-        if keyword in text.lower() and ':' in text:
+    for pattern in _CSS_COLON_PATTERNS:
+        if pattern.search(text):
             return True
 
+    if _CSS_KEYWORDS_RE.search(text.lower()):
+        return True
+
     # Check for URLs that appear in DTD declarations
     if 'http://www.w3.org/' in text and 'DTD' in text:
         return True
@@ -426,14 +663,13 @@ def decode_html_entities(text):
     """
     decoded = html.unescape(text)
 
-    pattern = r'&#x([0-9A-Fa-f]{4,6});'
     def replace_entity(match):
         try:
             return chr(int(match.group(1), 16))
         except:
             return match.group(0)
 
-    decoded = re.sub(pattern, replace_entity, decoded)
+    decoded = _HEX_ENTITY_RE.sub(replace_entity, decoded)
     return decoded
 
 def process_ruby_tags(content, ruby_handling):
@@ -441,106 +677,126 @@ def process_ruby_tags(content, ruby_handling):
     Process ruby tags based on handling mode with complex ruby support
     """
     if ruby_handling == 'remove_all':
-        content = re.sub(r'<ruby>(.*?)</ruby>', r'\1', content, flags=re.DOTALL)
-        content = re.sub(r'<r[ubt]>', '', content)
-
-    elif ruby_handling == 'remove_hiragana':
-        def replace_complex_ruby(match):
-            ruby_content = match.group(1)
-            rb_rt_pairs = re.findall(r'<rb>(.*?)</rb>\s*<rt>(.*?)</rt>', ruby_content, re.DOTALL)
-
-            if rb_rt_pairs:
-                result_parts = []
-                for rb_text, rt_text in rb_rt_pairs:
-                    rb_text = rb_text.strip()
-                    rt_text = rt_text.strip()
-
-                    if rt_text and is_hiragana(rt_text):
-                        result_parts.append(rb_text)
-                    elif rt_text:
-                        result_parts.append(f"{rb_text}({rt_text})")
-                    else:
-                        result_parts.append(rb_text)
-
-                return ''.join(result_parts)
-            else:
-                base_match = re.search(r'<rb>(.*?)</rb>', ruby_content, re.DOTALL)
-                rt_match = re.search(r'<rt>(.*?)</rt>', ruby_content, re.DOTALL)
+        content = _RUBY_BLOCK_RE.sub(r'\1', content)
 
-                if base_match:
-                    base_text = base_match.group(1).strip()
-                    if rt_match:
-                        rt_text = rt_match.group(1).strip()
-                        if rt_text and is_hiragana(rt_text):
-                            return base_text
-                        else:
-                            return f"{base_text}({rt_text})" if rt_text else base_text
-                    return base_text
+    elif ruby_handling in _RUBY_FORMAT_MODES:
+        # One callback per <ruby> block for both modes; they only differ in _format_ruby
+        content = _RUBY_BLOCK_RE.sub(
+            lambda match: _replace_ruby_block(match.group(1), ruby_handling), content)
 
-                return ruby_content
+        # Only nested ruby can leave a simple <ruby>base<rt>reading</rt></ruby> behind
+        if '<ruby>' in content:
+            content = _RUBY_SIMPLE_RE.sub(
+                lambda match: _format_ruby(match.group(1).strip(), match.group(2).strip(),
+                                           ruby_handling), content)
 
-        content = re.sub(r'<ruby>(.*?)</ruby>', replace_complex_ruby, content, flags=re.DOTALL)
+    else:
+        return content
 
-        def replace_simple_ruby(match):
-            full_content = match.group(0)
-            base_text = match.group(1).strip()
-            rt_text = match.group(2).strip()
+    return _RUBY_OPEN_TAG_RE.sub('', content)
 
-            if not rt_text:
-                return base_text
+def _replace_ruby_block(ruby_content, ruby_handling):
+    """
+    Replacement for the content of one <ruby> block: base(reading) for each <rb>/<rt> pair
+    """
+    # Without <rb> the block is kept as is; its ruby tags are stripped afterwards
+    if '<rb>' not in ruby_content:
+        return ruby_content
 
-            if is_hiragana(rt_text):
-                return base_text
-            else:
-                return f"{base_text}({rt_text})"
+    rb_rt_pairs = _RB_RT_PAIR_RE.findall(ruby_content)
+    if rb_rt_pairs:
+        return ''.join(_format_ruby(rb_text.strip(), rt_text.strip(), ruby_handling)
+                       for rb_text, rt_text in rb_rt_pairs)
 
-        content = re.sub(r'<ruby>([^<]+)<rt>([^<]*)</rt></ruby>', replace_simple_ruby, content)
-        content = re.sub(r'<r[ubt]>', '', content)
+    base_match = _RB_RE.search(ruby_content)
+    if not base_match:
+        return ruby_content
+    rt_match = _RT_RE.search(ruby_content)
+    rt_text = rt_match.group(1).strip() if rt_match else ''
+    return _format_ruby(base_match.group(1).strip(), rt_text, ruby_handling)
 
-    elif ruby_handling == 'keep_all':
-        def replace_ruby_keep_all(match):
-            ruby_content = match.group(1)
+def _format_ruby(base_text, rt_text, ruby_handling):
+    """
+    base(reading), or just the base when there is no reading or it is hiragana in remove_hiragana mode
+    """
+    if not rt_text or (ruby_handling == 'remove_hiragana' and is_hiragana(rt_text)):
+        return base_text
+    return f"{base_text}({rt_text})"
 
-            rb_rt_pairs = re.findall(r'<rb>(.*?)</rb>\s*<rt>(.*?)</rt>', ruby_content, re.DOTALL)
+def extract_content_from_html(content, ruby_handling=None):
+    """
+    Extract content from HTML with advanced processing including image positions
+    """
+    if etree is not None:
+        try:
+            return _extract_content_lxml(content, ruby_handling)
+        except Exception:
+            # Fall back to the regex pipeline for anything lxml cannot parse
+            pass
+    return _extract_content_regex(content, ruby_handling)
 
-            if rb_rt_pairs:
-                result_parts = []
-                for rb_text, rt_text in rb_rt_pairs:
-                    rb_text = rb_text.strip()
-                    rt_text = rt_text.strip()
-                    if rt_text:
-                        result_parts.append(f"{rb_text}({rt_text})")
-                    else:
-                        result_parts.append(rb_text)
-                return ''.join(result_parts)
-            else:
-                base_match = re.search(r'<rb>(.*?)</rb>', ruby_content, re.DOTALL)
-                rt_match = re.search(r'<rt>(.*?)</rt>', ruby_content, re.DOTALL)
+def _extract_content_lxml(content, ruby_handling=None):
+    """
+    Extract content with a single lxml parse: text is emitted in document order,
+    with line breaks at <br> and block elements and (img) in place of images
+    """
+    if ruby_handling:
+        if isinstance(content, bytes):
+            content = content.decode('utf-8', errors='replace')
+        content = process_ruby_tags(content, ruby_handling)
+    if isinstance(content, str):
+        content = content.encode('utf-8')
 
-                if base_match:
-                    base_text = base_match.group(1).strip()
-                    if rt_match:
-                        rt_text = rt_match.group(1).strip()
-                        return f"{base_text}({rt_text})" if rt_text else base_text
-                    return base_text
+    parser = etree.HTMLParser(encoding='utf-8', remove_comments=True, remove_pis=True)
+    root = etree.fromstring(content, parser)
+    if root is None:
+        return []
 
-                return ruby_content
+    parts = []
+    _collect_text(root, parts)
 
-        content = re.sub(r'<ruby>(.*?)</ruby>', replace_ruby_keep_all, content, flags=re.DOTALL)
+    result = []
+    for line in ''.join(parts).split('\n'):
+        cleaned = line.strip()
+        if cleaned and not is_css_content(cleaned):
+            result.append(cleaned)
+    return result
 
-        def replace_simple_ruby_keep(match):
-            base_text = match.group(1).strip()
-            rt_text = match.group(2).strip()
-            return f"{base_text}({rt_text})" if rt_text else base_text
+def _collect_text(element, parts):
+    """
+    Append the text of an element subtree to parts in document order
+    """
+    tag = element.tag
+    if not isinstance(tag, str) or tag in _SKIP_TAGS:
+        return
+    if tag == 'img':
+        parts.append('(img)')
+        return
+    if tag == 'br':
+        parts.append('\n')
+        return
 
-        content = re.sub(r'<ruby>([^<]+)<rt>([^<]*)</rt></ruby>', replace_simple_ruby_keep, content)
-        content = re.sub(r'<r[ubt]>', '', content)
+    block = tag in _BLOCK_TAGS
+    if block:
+        parts.append('\n')
+    if element.text:
+        parts.append(element.text)
+    for child in element:
+        _collect_text(child, parts)
+        if child.tail:
+            parts.append(child.tail)
+    if block:
+        parts.append('\n')
 
-    return content
+def _boundary_replacement(match):
+    """
+    Replacement for _BOUNDARY_RE matches
+    """
+    return '(img)' if match.lastgroup == 'img' else '\n'
 
-def extract_content_from_html(content, ruby_handling=None):
+def _extract_content_regex(content, ruby_handling=None):
     """
-    Extract content from HTML with advanced processing including image positions
+    Extract content with the regex pipeline (used when lxml is unavailable or fails)
     """
     if isinstance(content, bytes):
         try:
@@ -548,31 +804,20 @@ def extract_content_from_html(content, ruby_handling=None):
         except UnicodeDecodeError:
             content = content.decode('utf-8', errors='replace')
 
-    # Remove DOCTYPE and XML declarations
-    content = re.sub(r'<!DOCTYPE[^>]*>', '', content, flags=re.IGNORECASE)
-    content = re.sub(r'<\?xml[^>]*\?>', '', content, flags=re.IGNORECASE)
-    content = re.sub(r'<!doctype[^>]*>', '', content, flags=re.IGNORECASE)
-
-    # Remove HTML comments
-    content = re.sub(r'<!--.*?-->', '', content, flags=re.DOTALL)
+    # Remove DOCTYPE/XML declarations, comments, style and script blocks in one pass
+    content = _NOISE_RE.sub('', content)
 
     if ruby_handling:
         content = process_ruby_tags(content, ruby_handling)
 
     result = []
 
-    content = re.sub(r'<style[^>]*>.*?</style>', '', content, flags=re.DOTALL | re.IGNORECASE)
-    content = re.sub(r'<script[^>]*>.*?</script>', '', content, flags=re.DOTALL | re.IGNORECASE)
-
-    content = re.sub(r'<img[^>]*>', '(img)', content, flags=re.IGNORECASE)
-
-    content = re.sub(r'<br\s*/?>', '\n', content, flags=re.IGNORECASE)
-    content = re.sub(r'</p>\s*<p[^>]*>', '\n', content, flags=re.IGNORECASE)
-    content = re.sub(r'</div>\s*<div[^>]*>', '\n', content, flags=re.IGNORECASE)
+    # Images become (img); <br> and paragraph/div boundaries become line breaks
+    content = _BOUNDARY_RE.sub(_boundary_replacement, content)
 
     lines = content.split('\n')
     for line in lines:
-        cleaned = re.sub(r'<[^>]+>', '', line)
+        cleaned = _TAG_RE.sub('', line)
         cleaned = decode_html_entities(cleaned)
         cleaned = cleaned.strip()
         if cleaned and not is_css_content(cleaned):
@@ -1,6 +1,100 @@
 import os
+import csv
+import string
+from functools import lru_cache
+import numpy as np
 import pandas as pd
 
+RESULT_COLUMNS = ['id', 'raw', 'edit', 'status']
+
+# Language codes recognised in input file names, in detection priority order
+LANGUAGES = ('JP', 'EN', 'KR', 'CN', 'VI')
+
+
+@lru_cache(maxsize=4)
+def _load_input_csv(input_path, mtime_ns, size):
+    """Parse input CSV once per (path, mtime, size) - file changes invalidate the entry"""
+    df = PromptHelper.read_input_csv(input_path)
+    # Keep cached frame sorted by id so range filters and batch lookup can use binary search
+    if not df['id'].is_monotonic_increasing:
+        df = df.sort_values('id', kind='stable', ignore_index=True)
+    return df
+
+
+@lru_cache(maxsize=1024)
+def _detect_language(filename):
+    """Language code for a file name - the first of LANGUAGES found in it, by list order"""
+    filename = filename.upper()
+    for lang in LANGUAGES:
+        if lang in filename:
+            return lang
+    return None
+
+
+@lru_cache(maxsize=1024)
+def _output_path(input_path, prompt_type):
+    """Output file path for an input file and prompt type (pure path computation, no I/O)"""
+    input_filename = os.path.basename(input_path)
+
+    # Detect language from filename
+    lang_folder = _detect_language(input_filename) or "Other"
+
+    # Create output filename
+    filename_without_ext, ext = os.path.splitext(input_filename)
+
+    # Keep the same extension as input file if it's CSV or Excel
+    output_ext = ext if ext.lower() in ['.csv', '.xlsx', '.xls'] else '.csv'
+
+    if prompt_type:
+        output_filename = f"{filename_without_ext}_{prompt_type}_translated{output_ext}"
+    else:
+        output_filename = f"{filename_without_ext}_translated{output_ext}"
+
+    output_dir = os.path.join(
+        os.path.expanduser("~"),
+        "Documents",
+        "AIBridge",
+        "Translated",
+        lang_folder
+    )
+    return os.path.join(output_dir, output_filename)
+
+
+@lru_cache(maxsize=1)
+def _load_prompt_df(prompt_file, mtime_ns, size):
+    """Parse the prompt workbook once per (path, mtime, size) - edits to the file invalidate the entry"""
+    return pd.read_excel(prompt_file)
+
+
+@lru_cache(maxsize=32)
+def _lookup_prompt(prompt_file, mtime_ns, size, source_lang, prompt_type):
+    """Formatted prompt template for a language and prompt type, plus error messages when there is none.
+
+    Keyed on the workbook's mtime and size like _load_prompt_df, so editing the file invalidates it.
+    """
+    df = _load_prompt_df(prompt_file, mtime_ns, size)
+
+    if 'type' in df.columns and source_lang in df.columns:
+        prompt_row = df[df['type'] == prompt_type]
+        if not prompt_row.empty:
+            prompt = prompt_row.iloc[0][source_lang]
+            if pd.notna(prompt) and prompt:
+                prompt_with_format = prompt.strip() + "\n{count_info}\nVẫn giữ định dạng đánh số như bản gốc (1., 2., ...).\n" \
+                                                      "Đây là văn bản cần chuyển ngữ:\n{text}"
+                # "Chỉ trả về các dòng dịch được đánh số, không viết thêm bất kỳ nội dung nào khác.\n" \ \
+                return prompt_with_format, ()
+            return None, (f"Error: Prompt is empty for {source_lang}, type: {prompt_type}",)
+        return None, (f"Error: Prompt type '{prompt_type}' not found in file",)
+
+    errors = []
+    if 'type' not in df.columns:
+        errors.append("Error: 'type' column not found in prompt file")
+    if source_lang not in df.columns:
+        errors.append(f"Error: Language column '{source_lang}' not found in prompt file")
+        available_langs = [col for col in df.columns if col not in ['type', 'description']]
+        errors.append(f"Available languages: {', '.join(available_langs)}")
+    return None, tuple(errors)
+
 
 class PromptHelper:
     """Helper class for prompt and batch processing operations"""
@@ -8,11 +102,7 @@ class PromptHelper:
     @staticmethod
     def detect_language(filepath):
         """Detect language from filename"""
-        filename = os.path.basename(filepath)
-        for lang in ['JP', 'EN', 'KR', 'CN', 'VI']:
-            if lang in filename.upper():
-                return lang
-        return None
+        return _detect_language(os.path.basename(filepath))
 
     @staticmethod
     def load_translation_prompt(input_path, prompt_type, log_func=None):
@@ -30,95 +120,107 @@ class PromptHelper:
 
         try:
             prompt_file = "assets/translate_prompt.xlsx"
-            if not os.path.exists(prompt_file):
+            try:
+                st = os.stat(prompt_file)
+            except FileNotFoundError:
                 if log_func:
                     log_func("Error: Prompt file not found at assets/translate_prompt.xlsx")
                 return None
 
-            df = pd.read_excel(prompt_file)
-
-            if 'type' in df.columns and source_lang in df.columns:
-                prompt_row = df[df['type'] == prompt_type]
-                if not prompt_row.empty:
-                    prompt = prompt_row.iloc[0][source_lang]
-                    if pd.notna(prompt) and prompt:
-                        if log_func:
-                            log_func(f"Successfully loaded prompt for {source_lang}, type: {prompt_type}")
-
-                        prompt_with_format = prompt.strip() + "\n{count_info}\nVẫn giữ định dạng đánh số như bản gốc (1., 2., ...).\n" \
-                                                              "Đây là văn bản cần chuyển ngữ:\n{text}"
-                        # "Chỉ trả về các dòng dịch được đánh số, không viết thêm bất kỳ nội dung nào khác.\n" \ \
-                        return prompt_with_format
-                    else:
-                        if log_func:
-                            log_func(f"Error: Prompt is empty for {source_lang}, type: {prompt_type}")
-                else:
-                    if log_func:
-                        log_func(f"Error: Prompt type '{prompt_type}' not found in file")
-            else:
-                if log_func:
-                    if 'type' not in df.columns:
-                        log_func("Error: 'type' column not found in prompt file")
-                    if source_lang not in df.columns:
-                        log_func(f"Error: Language column '{source_lang}' not found in prompt file")
-                        available_langs = [col for col in df.columns if col not in ['type', 'description']]
-                        log_func(f"Available languages: {', '.join(available_langs)}")
-
-            return None
+            prompt_with_format, errors = _lookup_prompt(prompt_file, st.st_mtime_ns, st.st_size,
+                                                        source_lang, prompt_type)
+            if log_func:
+                for message in errors:
+                    log_func(message)
+                if prompt_with_format:
+                    log_func(f"Successfully loaded prompt for {source_lang}, type: {prompt_type}")
+            return prompt_with_format
 
         except Exception as e:
             if log_func:
                 log_func(f"Error loading prompt file: {e}")
             return None
 
+    @staticmethod
+    def load_prompt_file(prompt_file="assets/translate_prompt.xlsx"):
+        """Load the prompt workbook through an in-memory cache (returned DataFrame is shared, do not mutate)"""
+        st = os.stat(prompt_file)
+        return _load_prompt_df(prompt_file, st.st_mtime_ns, st.st_size)
+
+    @staticmethod
+    def compile_prompt_template(template):
+        """Parse a str.format prompt template once and return a renderer taking the field values"""
+        parts = tuple((literal, field) for literal, field, _, _ in string.Formatter().parse(template))
+
+        def render(**values):
+            return "".join(literal + (values[field] if field is not None else "") for literal, field in parts)
+
+        return render
+
     @staticmethod
     def generate_output_path(input_path, prompt_type):
         """Generate output path based on input file name and prompt type"""
-        input_filename = os.path.basename(input_path)
-
-        # Detect language from filename
-        lang_folder = PromptHelper.detect_language(input_path)
-        if not lang_folder:
-            lang_folder = "Other"
-
-        # Create output filename
-        filename_without_ext, ext = os.path.splitext(input_filename)
-
-        # Keep the same extension as input file if it's CSV or Excel
-        output_ext = ext if ext.lower() in ['.csv', '.xlsx', '.xls'] else '.csv'
-
-        if prompt_type:
-            output_filename = f"{filename_without_ext}_{prompt_type}_translated{output_ext}"
-        else:
-            output_filename = f"{filename_without_ext}_translated{output_ext}"
-
-        # Create output directory
-        output_dir = os.path.join(
-            os.path.expanduser("~"),
-            "Documents",
-            "AIBridge",
-            "Translated",
-            lang_folder
-        )
+        output_path = _output_path(input_path, prompt_type)
+
+        # Create output directory (checked on every call, the folder may have been removed)
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        return output_path
+
+    @staticmethod
+    def read_input_csv(input_path):
+        """Read only 'id' and 'text' columns from input CSV, using PyArrow engine when available"""
+        try:
+            import pyarrow as pa
+            df = pd.read_csv(input_path, engine="pyarrow", usecols=['id', 'text'], dtype_backend="pyarrow")
+            # PyArrow loads bytes it cannot decode as UTF-8 into binary columns instead of failing;
+            # re-read with the C engine so the decode error is raised as before
+            if any(pa.types.is_binary(dtype.pyarrow_dtype) or pa.types.is_large_binary(dtype.pyarrow_dtype)
+                   for dtype in df.dtypes if hasattr(dtype, 'pyarrow_dtype')):
+                df = pd.read_csv(input_path, usecols=['id', 'text'])
+        except ImportError:
+            # PyArrow not installed, fall back to default C engine
+            df = pd.read_csv(input_path, usecols=['id', 'text'])
+
+        # Empty cells would otherwise reach the prompt as "<NA>" or "nan"
+        df['text'] = df['text'].fillna('')
+        return df
 
-        os.makedirs(output_dir, exist_ok=True)
-        return os.path.join(output_dir, output_filename)
+    @staticmethod
+    def load_input_csv(input_path, st=None):
+        """Load input CSV through an in-memory cache (returned DataFrame is shared, do not mutate)
+
+        Pass an os.stat result already taken by the caller to avoid a second stat.
+        """
+        if st is None:
+            st = os.stat(input_path)
+        return _load_input_csv(input_path, st.st_mtime_ns, st.st_size)
 
     @staticmethod
     def apply_id_filters(df, start_id, stop_id):
         """Apply start_id and stop_id filters to dataframe"""
         try:
-            if start_id:
-                start_id = int(start_id)
-                df = df[df['id'] >= start_id]
-
-            if stop_id:
-                stop_id = int(stop_id)
-                df = df[df['id'] <= stop_id]
+            start_id = int(start_id) if start_id else None
+            stop_id = int(stop_id) if stop_id else None
+
+            if start_id is None and stop_id is None:
+                return df
+
+            ids = df['id']
+            if ids.is_monotonic_increasing:
+                # Sorted ids: locate range bounds with binary search and slice
+                id_values = ids.to_numpy()
+                lo = np.searchsorted(id_values, start_id, side='left') if start_id is not None else 0
+                hi = np.searchsorted(id_values, stop_id, side='right') if stop_id is not None else len(id_values)
+                return df.iloc[lo:hi]
+
+            mask = ids.notna()
+            if start_id is not None:
+                mask &= ids >= start_id
+            if stop_id is not None:
+                mask &= ids <= stop_id
+            return df[mask]
         except:
-            pass
-
-        return df
+            return df
 
     @staticmethod
     def load_existing_results(output_path):
@@ -129,64 +231,159 @@ class PromptHelper:
 
         if os.path.exists(output_path):
             try:
-                # Check file extension
-                _, ext = os.path.splitext(output_path)
-                ext = ext.lower()
-
-                if ext in ['.xlsx', '.xls']:
-                    existing_df = pd.read_excel(output_path, engine='openpyxl')
-                else:
-                    existing_df = pd.read_csv(output_path)
-
-                if not existing_df.empty:
-                    for _, row in existing_df.iterrows():
-                        row_id = row['id']
-                        existing_results[row_id] = {
-                            'id': row_id,
-                            'raw': row.get('raw', ''),
-                            'edit': row.get('edit', ''),
-                            'status': row.get('status', '')
-                        }
-
-                        # Check if translation exists and is valid
-                        edit_value = row.get('edit', '')
-                        if edit_value and str(edit_value).strip() and str(edit_value).strip() != 'nan':
-                            completed_ids.add(row_id)
-                        else:
-                            failed_ids.add(row_id)
+                existing_df = PromptHelper.read_results_file(output_path)
+                existing_results, completed_ids, failed_ids = PromptHelper.analyze_results(existing_df)
             except:
                 pass
 
         return existing_results, completed_ids, failed_ids
 
+    @staticmethod
+    def analyze_results(existing_df):
+        """Build (existing_results, completed_ids, failed_ids) from a loaded output frame"""
+        if existing_df.empty:
+            return {}, set(), set()
+
+        ids = existing_df['id'].tolist()
+        # Missing optional columns read as '' for every row
+        columns = {
+            col: existing_df[col].tolist() if col in existing_df.columns else [''] * len(ids)
+            for col in ('raw', 'edit', 'status')
+        }
+        existing_results = {
+            row_id: {'id': row_id, 'raw': raw, 'edit': edit, 'status': status}
+            for row_id, raw, edit, status in zip(ids, columns['raw'], columns['edit'], columns['status'])
+        }
+
+        # A translation counts as done when edit is non-empty (not blank, NaN or 0)
+        mask = PromptHelper._valid_edit_mask(existing_df)
+        id_values = existing_df['id'].to_numpy()
+        completed_ids = set(id_values[mask].tolist())
+        failed_ids = set(id_values[~mask].tolist())
+        return existing_results, completed_ids, failed_ids
+
+    @staticmethod
+    def load_completed_ids(output_path):
+        """Set of ids already translated in an output file, reading only its id and edit columns"""
+        if not os.path.exists(output_path):
+            return set()
+        try:
+            results_df = PromptHelper.read_results_file(output_path, columns=('id', 'edit'))
+            id_values = results_df['id'].to_numpy()
+            return set(id_values[PromptHelper._valid_edit_mask(results_df)].tolist())
+        except:
+            return set()
+
+    @staticmethod
+    def read_results_file(output_path, columns=RESULT_COLUMNS):
+        """Read the given result columns that exist in an output file (CSV or Excel)"""
+        _, ext = os.path.splitext(output_path)
+
+        if ext.lower() in ['.xlsx', '.xls']:
+            return pd.read_excel(output_path, engine='openpyxl', usecols=lambda col: col in columns)
+        return PromptHelper.read_results_csv(output_path, columns)
+
+    @staticmethod
+    def read_results_csv(output_path, columns=RESULT_COLUMNS):
+        """Read the given result columns that exist in a CSV output file"""
+        # Text columns are read as written - no type inference and no NA sentinel
+        # matching, so an empty cell is ''; only an empty id counts as missing
+        return pd.read_csv(output_path, usecols=lambda col: col in columns,
+                           dtype={col: str for col in columns if col != 'id'},
+                           keep_default_na=False, na_values={'id': ['']})
+
+    @staticmethod
+    def _valid_edit_mask(results_df):
+        """Boolean array marking rows whose 'edit' holds a usable translation"""
+        if 'edit' not in results_df.columns:
+            return np.zeros(len(results_df), dtype=bool)
+        edits = results_df['edit']
+        if pd.api.types.is_numeric_dtype(edits):
+            return (edits.notna() & (edits != 0)).to_numpy(dtype=bool)
+        stripped = edits.astype(str).str.strip()
+        return (edits.notna() & (stripped != '') & (stripped != 'nan')).to_numpy(dtype=bool)
+
     @staticmethod
     def create_batch_text(batch_df):
         """Create numbered text from batch dataframe"""
-        batch_lines = []
-        for j, (_, row) in enumerate(batch_df.iterrows(), 1):
-            batch_lines.append(f"{j}. {row['text']}")
-        return "\n".join(batch_lines)
+        texts = batch_df['text'].to_numpy(dtype=object, copy=False)
+        return "\n".join(f"{j}. {text}" for j, text in enumerate(texts, 1))
 
     @staticmethod
     def save_results(existing_results, output_path):
         """Save results to CSV or Excel file based on extension"""
         if existing_results:
-            results_list = list(existing_results.values())
-            results_df = pd.DataFrame(results_list)
-            results_df_sorted = results_df.sort_values('id')
-
             # Check output format by extension
             _, ext = os.path.splitext(output_path)
             ext = ext.lower()
 
             if ext in ['.xlsx', '.xls']:
-                results_df_sorted.to_excel(output_path, index=False, engine='openpyxl')
+                results_df = pd.DataFrame(list(existing_results.values()))
+                results_df.sort_values('id').to_excel(output_path, index=False, engine='openpyxl')
             else:
-                results_df_sorted.to_csv(output_path, index=False)
+                PromptHelper.write_results_csv(existing_results, output_path)
 
             return True
         return False
 
+    @staticmethod
+    def write_results_csv(existing_results, output_path):
+        """Write results as CSV sorted by id, whatever the file extension"""
+        # Serialize all rows in one writerows call, no intermediate DataFrame
+        rows = sorted(existing_results.values(), key=lambda row: row['id'])
+        with open(output_path, 'w', newline='', encoding='utf-8') as f:
+            csv_writer = csv.writer(f)
+            csv_writer.writerow(RESULT_COLUMNS)
+            csv_writer.writerows(
+                ['' if pd.isna(value) else value for value in (row.get(col, '') for col in RESULT_COLUMNS)]
+                for row in rows
+            )
+
+    @staticmethod
+    def append_results(new_rows, existing_results, output_path, rewrite=True, max_saved_id=None):
+        """Append new rows to CSV output, falling back to a full sorted rewrite when needed
+
+        Rows are appended only when the output is an existing CSV and every new id
+        is greater than all ids already saved, so the file stays sorted by id.
+        existing_results is updated with new_rows in both cases. With rewrite=False
+        rows that cannot be appended are left for a later save_results call.
+        Callers that track the largest saved id can pass it as max_saved_id
+        to skip scanning existing_results for it.
+        Returns True when the rows were written.
+        """
+        if not new_rows:
+            return False
+
+        new_ids = [row['id'] for row in new_rows]
+        # bool() matters: a bare `and` chain would keep a reference to existing_results,
+        # which is filled below and would turn an empty (falsy) result truthy
+        can_append = bool(
+            os.path.splitext(output_path)[1].lower() == '.csv'
+            and existing_results
+            and os.path.exists(output_path)
+            and min(new_ids) > (max(existing_results) if max_saved_id is None else max_saved_id)
+        )
+
+        if can_append:
+            # Only append to a file written with the expected column layout
+            with open(output_path, 'r', encoding='utf-8') as f:
+                can_append = f.readline().strip() == ','.join(RESULT_COLUMNS)
+
+        for row in new_rows:
+            existing_results[row['id']] = row
+
+        if not can_append:
+            return PromptHelper.save_results(existing_results, output_path) if rewrite else False
+
+        with open(output_path, 'a', newline='', encoding='utf-8') as f:
+            csv_writer = csv.writer(f)
+            csv_writer.writerows(
+                ['' if pd.isna(value) else value for value in (row[col] for col in RESULT_COLUMNS)]
+                for row in new_rows
+            )
+
+        return True
+
     @staticmethod
     def find_next_batch(df, output_path, batch_size):
         """Find the next batch of IDs that need processing"""
@@ -196,20 +393,22 @@ class PromptHelper:
         if batch_size <= 0:
             return None
 
-        all_input_ids = set(df['id'].tolist())
+        if not df['id'].is_monotonic_increasing:
+            df = df.sort_values('id', kind='stable')
 
-        # Load existing results
-        _, completed_ids, _ = PromptHelper.load_existing_results(output_path)
+        # Only the completed ids are needed here, not the full results
+        completed_ids = PromptHelper.load_completed_ids(output_path)
 
-        # Find IDs to process
-        ids_to_process = sorted(all_input_ids - completed_ids)
+        # Positions of rows still to process, in id order
+        pending = np.ones(len(df), dtype=bool)
+        if completed_ids:
+            pending = ~np.isin(df['id'].to_numpy(), list(completed_ids))
+        positions = np.flatnonzero(pending)
 
-        if not ids_to_process:
+        if len(positions) == 0:
             return None
 
-        # Get next batch
-        batch_ids = ids_to_process[:min(batch_size, len(ids_to_process))]
-        batch_df = df[df['id'].isin(batch_ids)].sort_values('id')
+        # Get next batch - positional take already returns a new frame, no copy needed
+        batch_df = df.iloc[positions[:batch_size]]
 
-        # Return a copy to ensure data persists
-        return batch_df.copy() if not batch_df.empty else None
\ No newline at end of file
+        return batch_df if not batch_df.empty else None
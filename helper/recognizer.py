@@ -1,7 +1,28 @@
 import cv2
 import numpy as np
+from functools import lru_cache
 from PIL import ImageGrab, ImageStat
 
+# Templates are decoded once per path; call _load_template.cache_clear() if files change on disk
+@lru_cache(maxsize=256)
+def _load_template(template_path):
+  """Decode a template image as a read-only BGR array"""
+  template = cv2.imread(template_path, cv2.IMREAD_COLOR)
+  if template is None:
+    # Raise instead of returning None so a missing file is not cached
+    raise FileNotFoundError(template_path)
+  # Handle RGBA templates
+  if len(template.shape) == 3 and template.shape[2] == 4:
+    template = cv2.cvtColor(template, cv2.COLOR_BGRA2BGR)
+  template.setflags(write=False)
+  return template
+
+def load_template(template):
+  """Return a template array from a path (cached) or an already loaded array"""
+  if isinstance(template, np.ndarray):
+    return template
+  return _load_template(template)
+
 def validate_region_coordinates(region):
   """Validate and fix region coordinates to prevent PyAutoGUI errors"""
   if not region:
@@ -36,8 +57,20 @@ def validate_region_coordinates(region):
     print(f"[ERROR] Invalid region format: {region}")
     return None
 
-def match_template(template_path, region=None, threshold=0.85, debug=False):
-  """Match template with improved region handling and error prevention"""
+def grab_screen(region=None):
+  """Capture the screen (or an (x, y, width, height) region) as a BGR array"""
+  bbox_region = validate_region_coordinates(region) if region else None
+  if bbox_region:
+    screen = np.array(ImageGrab.grab(bbox=bbox_region))
+  else:
+    screen = np.array(ImageGrab.grab())
+  return cv2.cvtColor(screen, cv2.COLOR_RGB2BGR)
+
+def match_template(template_path, region=None, threshold=0.85, debug=False, screen=None):
+  """Match template with improved region handling and error prevention
+
+  screen may be a BGR capture of region (see grab_screen) to search without grabbing again.
+  """
   try:
     # Validate and convert region if provided
     bbox_region = None
@@ -47,37 +80,33 @@ def match_template(template_path, region=None, threshold=0.85, debug=False):
         print(f"[ERROR] Invalid region for template matching: {region}")
         return []
 
-    # Get screenshot with error handling
-    try:
-      if bbox_region:
-        screen = np.array(ImageGrab.grab(bbox=bbox_region))
-      else:
-        screen = np.array(ImageGrab.grab())
-    except Exception as e:
-      print(f"[ERROR] Failed to capture screen: {e}")
-      return []
+    # Get screenshot with error handling, unless one was passed in
+    if screen is None:
+      try:
+        if bbox_region:
+          screen = np.array(ImageGrab.grab(bbox=bbox_region))
+        else:
+          screen = np.array(ImageGrab.grab())
+      except Exception as e:
+        print(f"[ERROR] Failed to capture screen: {e}")
+        return []
 
-    # Convert color space
-    screen = cv2.cvtColor(screen, cv2.COLOR_RGB2BGR)
+      # Convert color space
+      screen = cv2.cvtColor(screen, cv2.COLOR_RGB2BGR)
 
-    # Load template with error handling
+    # Load template (path or preloaded array) with error handling
     try:
-      template = cv2.imread(template_path, cv2.IMREAD_COLOR)
-      if template is None:
-        print(f"[ERROR] Could not load template: {template_path}")
-        return []
+      template = load_template(template_path)
+    except FileNotFoundError:
+      print(f"[ERROR] Could not load template: {template_path}")
+      return []
     except Exception as e:
       print(f"[ERROR] Failed to load template {template_path}: {e}")
       return []
 
-    # Handle RGBA templates
-    if len(template.shape) == 3 and template.shape[2] == 4:
-      template = cv2.cvtColor(template, cv2.COLOR_BGRA2BGR)
-
     # Perform template matching with error handling
     try:
-      result = cv2.matchTemplate(screen, template, cv2.TM_CCOEFF_NORMED)
-      loc = np.where(result >= threshold)
+      matches = _match_points(screen, template, threshold)
     except Exception as e:
       print(f"[ERROR] Template matching failed: {e}")
       return []
@@ -85,25 +114,15 @@ def match_template(template_path, region=None, threshold=0.85, debug=False):
     h, w = template.shape[:2]
     boxes = []
 
-    # Convert matches to box format
-    for pt in zip(*loc[::-1]):
-      x, y = pt
-      # Adjust coordinates if region was used
-      if bbox_region:
-        left, top = bbox_region[0], bbox_region[1]
-        x += left
-        y += top
-      boxes.append((x, y, w, h))
+    # Convert matches to box format, adjusting coordinates if region was used
+    left, top = (bbox_region[0], bbox_region[1]) if bbox_region else (0, 0)
+    for x, y, _ in matches:
+      boxes.append((x + left, y + top, w, h))
 
     # Debug output
     if debug and boxes:
-      for i, (x, y, w, h) in enumerate(boxes):
-        # Calculate confidence for debug
-        screen_y = y - (bbox_region[1] if bbox_region else 0)
-        screen_x = x - (bbox_region[0] if bbox_region else 0)
-        if 0 <= screen_y < result.shape[0] and 0 <= screen_x < result.shape[1]:
-          confidence = result[screen_y, screen_x]
-          print(f"  Match {i+1}: ({x}, {y}) - Confidence: {confidence:.3f}")
+      for i, ((x, y, w, h), (_, _, confidence)) in enumerate(zip(boxes, matches)):
+        print(f"  Match {i+1}: ({x}, {y}) - Confidence: {confidence:.3f}")
 
     return deduplicate_boxes(boxes)
 
@@ -111,6 +130,67 @@ def match_template(template_path, region=None, threshold=0.85, debug=False):
     print(f"[ERROR] Unexpected error in match_template: {e}")
     return []
 
+# Coarse pass: grayscale at 1/4 scale, keeping hits a little below the threshold
+_COARSE_SCALE = 0.25
+_COARSE_MARGIN = 0.05
+# Full-resolution refinement window padding around each coarse hit (px)
+_REFINE_PAD = 8
+# Fall back to a single full-resolution match for tiny templates or noisy coarse results
+_MIN_COARSE_SIZE = 8
+_MAX_COARSE_HITS = 50
+
+def _match_points(screen, template, threshold):
+  """(x, y, score) of positions where template matches screen, in row-major order"""
+  points = _coarse_to_fine(screen, template, threshold)
+  if points is None:
+    result = cv2.matchTemplate(screen, template, cv2.TM_CCOEFF_NORMED)
+    ys, xs = np.where(result >= threshold)
+    points = [(int(x), int(y), float(result[y, x])) for y, x in zip(ys, xs)]
+  return points
+
+def _shrink_gray(image):
+  """Grayscale copy of a BGR image at the coarse scale"""
+  gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+  return cv2.resize(gray, None, fx=_COARSE_SCALE, fy=_COARSE_SCALE, interpolation=cv2.INTER_AREA)
+
+def _coarse_to_fine(screen, template, threshold):
+  """Two-stage match: find candidates on a small grayscale image, verify each at full resolution
+
+  Returns None when the coarse pass is not worthwhile or verifies no candidate, so the caller
+  matches at full resolution.
+  """
+  h, w = template.shape[:2]
+  if min(h, w) * _COARSE_SCALE < _MIN_COARSE_SIZE:
+    return None
+
+  small_screen = _shrink_gray(screen)
+  small_template = _shrink_gray(template)
+  if (small_template.shape[0] > small_screen.shape[0]
+      or small_template.shape[1] > small_screen.shape[1]):
+    return None
+
+  coarse = cv2.matchTemplate(small_screen, small_template, cv2.TM_CCOEFF_NORMED)
+  ys, xs = np.where(coarse >= threshold - _COARSE_MARGIN)
+  if len(xs) > _MAX_COARSE_HITS:
+    return None
+
+  found = {}
+  for cy, cx in zip(ys, xs):
+    # Map the coarse hit back to full resolution and search a padded window around it
+    x0 = max(0, int(cx / _COARSE_SCALE) - _REFINE_PAD)
+    y0 = max(0, int(cy / _COARSE_SCALE) - _REFINE_PAD)
+    window = screen[y0:y0 + h + 2 * _REFINE_PAD, x0:x0 + w + 2 * _REFINE_PAD]
+    if window.shape[0] < h or window.shape[1] < w:
+      continue
+    result = cv2.matchTemplate(window, template, cv2.TM_CCOEFF_NORMED)
+    for y, x in zip(*np.where(result >= threshold)):
+      found[(x0 + int(x), y0 + int(y))] = float(result[y, x])
+
+  if not found:
+    # Downscaling can push a small icon's coarse score under the cutoff; confirm the miss at full resolution
+    return None
+  return sorted(((x, y, score) for (x, y), score in found.items()), key=lambda p: (p[1], p[0]))
+
 def deduplicate_boxes(boxes, min_dist=20):
   """Remove duplicate detection boxes that are too close to each other"""
   if not boxes:
@@ -169,20 +249,16 @@ def find_template_position(template_path, region=None, threshold=0.85, return_ce
     # Convert RGB to BGR for OpenCV
     screen = cv2.cvtColor(screen, cv2.COLOR_RGB2BGR)
 
-    # Load template image with error handling
+    # Load template image (cached) with error handling
     try:
-      template = cv2.imread(template_path, cv2.IMREAD_COLOR)
-      if template is None:
-        print(f"[ERROR] Template image not found: {template_path}")
-        return None
+      template = load_template(template_path)
+    except FileNotFoundError:
+      print(f"[ERROR] Template image not found: {template_path}")
+      return None
     except Exception as e:
       print(f"[ERROR] Failed to load template: {e}")
       return None
 
-    # Handle RGBA templates by converting to BGR
-    if len(template.shape) == 3 and template.shape[2] == 4:
-      template = cv2.cvtColor(template, cv2.COLOR_BGRA2BGR)
-
     # Perform template matching with error handling
     try:
       result = cv2.matchTemplate(screen, template, cv2.TM_CCOEFF_NORMED)
@@ -2,10 +2,35 @@ import pandas as pd
 import time
 import os
 import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from helper.ai_api_handler import AIAPIHandler
 from helper.prompt_helper import PromptHelper
 
+# Patterns used when parsing numbered AI responses, compiled once at import.
+# None of them uses lookarounds or lazy scans, so matching stays linear on long responses
+_NUMBER_RE = re.compile(r'(\d+)\.\s*')
+_NEXT_NUMBER_RE = re.compile(r'\n\d+\.')
+_LEADING_NUMBER_RE = re.compile(r'^\d+\.\s*')
+
+# Input CSV rows parsed per chunk while building the id -> text lookup
+_INPUT_CHUNK_ROWS = 100_000
+
+# Upper bound on batches sent at once when several API keys are configured
+_MAX_CONCURRENT_BATCHES = 4
+# Retries of a rate-limited (429) batch in concurrent mode, waiting 2, 4, 8... seconds
+_RATE_LIMIT_RETRIES = 4
+
+# Markers of AI-added comments after the last translated line, built once at import
+_SEPARATOR_PATTERNS = ('***', '---', '===', '___', '•••')
+_AI_START_PHRASES = (
+    'bạn muốn', 'bạn có', 'có muốn', 'có hài lòng',
+    'would you', 'do you', 'let me know', 'is there',
+    'có cần', 'nếu bạn', 'hãy cho', 'please',
+    'tôi có thể', 'i can', 'if you', 'feel free'
+)
+
 class TranslationProcessor:
     """Handles translation processing using various AI APIs"""
 
@@ -17,10 +42,14 @@ class TranslationProcessor:
         self.current_output_file = None
         self.total_input_rows = 0
         self.processed_rows = 0
+        # Completed rows counted in memory by process_with_api; None reads the output file
+        self._completed_count = None
 
     def update_progress(self):
         """Update progress display in status section"""
-        if self.current_output_file and os.path.exists(self.current_output_file):
+        if self._completed_count is not None:
+            self.processed_rows = self._completed_count
+        elif self.current_output_file and os.path.exists(self.current_output_file):
             try:
                 output_df = pd.read_csv(self.current_output_file)
                 # Count rows with text in edit column as processed
@@ -33,8 +62,11 @@ class TranslationProcessor:
         else:
             self.processed_rows = 0
 
-        # Update progress display with running status
-        self.main_window.status_section.set_progress(
+        # Update progress display with running status; this runs on worker threads,
+        # so the widget update is queued on the Tk event loop like log_message
+        self.main_window.root.after(
+            0,
+            self.main_window.status_section.set_progress,
             self.processed_rows,
             self.total_input_rows,
             self.is_running
@@ -47,6 +79,7 @@ class TranslationProcessor:
         # Initialize progress tracking
         self.processed_rows = 0
         self.total_input_rows = 0
+        self._completed_count = None
 
         try:
             # Get settings from tabs
@@ -82,7 +115,7 @@ class TranslationProcessor:
                 self.main_window.status_section.set_bot_status("Error: Not API service", "red")
                 return
 
-            api_config = processing_settings['api_configs'].get(ai_service, {})
+            api_config = self.main_window.processing_tab.get_api_config(ai_service)
             self.current_api_keys = api_config.get('keys', [])
 
             if not self.current_api_keys:
@@ -114,6 +147,8 @@ class TranslationProcessor:
             self.is_running = False
             # Final progress update with stopped status
             self.update_progress()
+            # Later updates (e.g. from the web bot) read the output file again
+            self._completed_count = None
             # Update main window running status
             self.main_window.root.after(0, self.set_main_window_stopped)
 
@@ -144,52 +179,71 @@ class TranslationProcessor:
             self.main_window.log_message("Error: Failed to load translation prompt")
             return
 
+        # Parse the ID range up front so input rows can be filtered while they are read
+        try:
+            start_id = int(start_id) if start_id else None
+            stop_id = int(stop_id) if stop_id else None
+        except Exception as e:
+            self.main_window.log_message(f"Warning: Could not filter by ID range: {e}")
+            start_id = stop_id = None
+
         # Read input file (CSV or Excel)
         try:
             # Check file extension
             _, ext = os.path.splitext(input_file)
             ext = ext.lower()
 
+            # Only id and text are used; other columns are never parsed
+            use_columns = lambda col: col in ('id', 'text')
             if ext in ['.xlsx', '.xls']:
-                df = pd.read_excel(input_file, engine='openpyxl')
-                self.main_window.log_message(f"Loaded {len(df)} rows from Excel file")
+                df = pd.read_excel(input_file, engine='openpyxl', usecols=use_columns)
+                file_kind = "Excel"
+                columns = df.columns
+                chunks = [df]
             else:
-                df = pd.read_csv(input_file)
-                self.main_window.log_message(f"Loaded {len(df)} rows from CSV file")
+                file_kind = "CSV"
+                # Parse just the header here; rows are streamed in chunks below
+                columns = pd.read_csv(input_file, nrows=0).columns
+                chunks = pd.read_csv(input_file, usecols=use_columns, chunksize=_INPUT_CHUNK_ROWS)
 
             # Check required columns
-            if 'id' not in df.columns:
+            if 'id' not in columns:
                 self.main_window.log_message("Error: File must have 'id' column")
                 return
-            if 'text' not in df.columns:
+            if 'text' not in columns:
                 self.main_window.log_message("Error: File must have 'text' column")
-                self.main_window.log_message(f"Available columns: {', '.join(df.columns)}")
+                if file_kind == "Excel":
+                    # df only holds the used columns, so list the file's own header
+                    columns = pd.read_excel(input_file, engine='openpyxl', nrows=0).columns
+                self.main_window.log_message(f"Available columns: {', '.join(map(str, columns))}")
                 return
 
+            # Text by id for batch lookups, filtered by ID range chunk by chunk so the
+            # full input is never held as one DataFrame
+            id_to_text = {}
+            total_rows = 0
+            after_start_rows = 0
+            for chunk in chunks:
+                total_rows += len(chunk)
+                if start_id is not None:
+                    chunk = chunk[chunk['id'] >= start_id]
+                    after_start_rows += len(chunk)
+                if stop_id is not None:
+                    chunk = chunk[chunk['id'] <= stop_id]
+                id_to_text.update(zip(chunk['id'].tolist(), chunk['text'].tolist()))
+
         except Exception as e:
             self.main_window.log_message(f"Error reading input file: {e}")
             return
 
-        # Apply ID range filters
-        try:
-            start_id = int(start_id) if start_id else None
-            stop_id = int(stop_id) if stop_id else None
-
-            original_df = df.copy()  # Keep original for reference
-
-            if start_id is not None:
-                df = df[df['id'] >= start_id]
-                self.main_window.log_message(f"Filtered by start_id >= {start_id}: {len(original_df)} -> {len(df)} rows")
-
-            if stop_id is not None:
-                df = df[df['id'] <= stop_id]
-                self.main_window.log_message(f"Filtered by stop_id <= {stop_id}: {len(df)} rows")
-
-        except Exception as e:
-            self.main_window.log_message(f"Warning: Could not filter by ID range: {e}")
+        self.main_window.log_message(f"Loaded {total_rows} rows from {file_kind} file")
+        if start_id is not None:
+            self.main_window.log_message(f"Filtered by start_id >= {start_id}: {total_rows} -> {after_start_rows} rows")
+        if stop_id is not None:
+            self.main_window.log_message(f"Filtered by stop_id <= {stop_id}: {len(id_to_text)} rows")
 
         # Create a set of all IDs that should be in the output (from filtered input)
-        all_input_ids = set(df['id'].tolist())
+        all_input_ids = set(id_to_text)
         self.main_window.log_message(f"Total IDs in range: {len(all_input_ids)} (Range: {min(all_input_ids)} to {max(all_input_ids)})")
 
         # Load existing output and check what needs processing
@@ -199,23 +253,11 @@ class TranslationProcessor:
 
         if os.path.exists(output_file):
             try:
-                existing_df = pd.read_csv(output_file)
+                # Output is always written as CSV, whatever its extension
+                existing_df = PromptHelper.read_results_csv(output_file)
                 if not existing_df.empty:
-                    for _, row in existing_df.iterrows():
-                        row_id = row['id']
-                        existing_results[row_id] = {
-                            'id': row_id,
-                            'raw': row.get('raw', ''),
-                            'edit': row.get('edit', ''),
-                            'status': row.get('status', '')
-                        }
-
-                        # Check if this ID has valid translation
-                        edit_value = row.get('edit', '')
-                        if edit_value and str(edit_value).strip() and str(edit_value).strip() != 'nan':
-                            completed_ids.add(row_id)
-                        else:
-                            failed_ids.add(row_id)
+                    # Column-wise build and vectorized completed/failed split
+                    existing_results, completed_ids, failed_ids = PromptHelper.analyze_results(existing_df)
 
                     self.main_window.log_message(f"Existing output has {len(existing_results)} rows total")
                     self.main_window.log_message(f"  - Completed: {len(completed_ids)} rows")
@@ -253,183 +295,330 @@ class TranslationProcessor:
         # Set total for progress tracking
         self.total_input_rows = len(all_input_ids)
         self.processed_rows = len(completed_ids & all_input_ids)
+        self._completed_count = self.processed_rows
+        # Whether existing_results holds rows not yet written to the output file
+        unsaved = False
+
+        # Identical texts are sent once: repeats of a text already translated in the output
+        # reuse that translation, other repeats share the result of the first id with the text
+        translation_cache = {existing_results[row_id]['raw']: existing_results[row_id]['edit'] for row_id in completed_ids}
+        ids_to_process, reused, followers = self._group_repeated_texts(ids_to_process, id_to_text, translation_cache)
+        if reused:
+            reused_rows = [
+                {'id': row_id, 'raw': id_to_text[row_id], 'edit': translation, 'status': ''}
+                for row_id, translation in sorted(reused.items())
+            ]
+            if not PromptHelper.append_results(reused_rows, existing_results, output_file, rewrite=False):
+                unsaved = True
+            self._completed_count += len(reused_rows)
+            self.main_window.log_message(f"Reused existing translations for {len(reused_rows)} rows with repeated text")
+        if followers:
+            repeated_count = sum(len(ids) for ids in followers.values())
+            self.main_window.log_message(f"{repeated_count} rows repeat a text in this run and will share its translation")
 
         # Process IDs in batches
         batch_size = int(batch_size) if batch_size else 10
         total_batches = (len(ids_to_process) - 1) // batch_size + 1 if len(ids_to_process) > 0 else 0
         rows_processed_count = 0
 
+        # With several API keys, up to one batch per key (capped) is in flight at once;
+        # results are still applied, saved and logged in batch order
+        workers = max(1, min(len(self.current_api_keys), _MAX_CONCURRENT_BATCHES))
+        if workers > 1:
+            self.main_window.log_message(f"Running up to {workers} batches at once ({len(self.current_api_keys)} API keys)")
+        # Without the pause between batches a 429 is expected now and then, so in concurrent
+        # mode it is retried after a delay instead of disabling the key for the rest of the run
+        self.api_handler.retry_rate_limits = workers > 1
+
         # Process IDs directly from the list, not from dataframe
-        for batch_num in range(1, total_batches + 1):
-            if not self.is_running:
-                self.main_window.log_message("Processing stopped by user")
-                break
+        batches = self._iter_batches(ids_to_process, id_to_text, batch_size, total_batches, prompt_template)
+        batches_left = True
+        in_flight = deque()
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while True:
+                # Keep every worker busy until the batches run out or the user stops
+                while batches_left and self.is_running and len(in_flight) < workers:
+                    batch = next(batches, None)
+                    if batch is None:
+                        batches_left = False
+                        break
+                    if workers > 1:
+                        future = executor.submit(self._call_api_with_backoff, batch[0], ai_service, batch[3],
+                                                 model_name, api_config)
+                    else:
+                        future = executor.submit(self._call_api, ai_service, batch[3], model_name, api_config,
+                                                 self.current_api_keys)
+                    in_flight.append((batch, future))
+
+                if not in_flight:
+                    if batches_left:
+                        self.main_window.log_message("Processing stopped by user")
+                    break
+
+                (batch_num, actual_batch_ids, batch_texts, _), future = in_flight.popleft()
+                translated_text, error_msg = future.result()
+                batch_len = len(actual_batch_ids)
+
+                if translated_text:
+                    # Parse translated text
+                    translations = self.parse_numbered_text(translated_text, batch_len)
+                    successful_count = sum(1 for t in translations if t)
+                    # Batch ids were missing or failed before, so every success is a newly completed row
+                    self._completed_count += successful_count
+                    self.main_window.log_message(f"Batch {batch_num} completed: {successful_count}/{batch_len} translations successful")
+
+                    # Update results
+                    batch_rows = [
+                        {
+                            'id': row_id,
+                            'raw': raw,
+                            'edit': translation,
+                            'status': '' if translation else 'failed'
+                        }
+                        for row_id, raw, translation in zip(actual_batch_ids, batch_texts, translations)
+                    ]
+                else:
+                    # Mark batch as failed
+                    self.main_window.log_message(f"Batch {batch_num} failed: {error_msg}")
+                    batch_rows = [
+                        {
+                            'id': row_id,
+                            'raw': raw,
+                            'edit': '',
+                            'status': 'failed'
+                        }
+                        for row_id, raw in zip(actual_batch_ids, batch_texts)
+                    ]
+
+                # Repeats of a text in this batch get the same result; keep rows sorted for appending
+                shared_rows = [
+                    dict(row, id=follower_id)
+                    for row in batch_rows for follower_id in followers.get(row['id'], ())
+                ]
+                if shared_rows:
+                    shared_count = sum(1 for row in shared_rows if row['edit'])
+                    self._completed_count += shared_count
+                    if shared_count:
+                        self.main_window.log_message(f"  {shared_count} repeated rows share these translations")
+                    batch_rows = sorted(batch_rows + shared_rows, key=lambda row: row['id'])
+
+                # Rows past the end of the output are appended right away; others (retries,
+                # gaps, no output file yet) wait for the periodic sorted rewrite below
+                if not PromptHelper.append_results(batch_rows, existing_results, output_file, rewrite=False):
+                    unsaved = True
+
+                rows_processed_count += len(batch_rows)
+
+                # Save and sort periodically
+                if rows_processed_count >= 1000 or batch_num == total_batches:
+                    if unsaved:
+                        PromptHelper.write_results_csv(existing_results, output_file)
+                        unsaved = False
+                    self.update_progress()
+
+                    if rows_processed_count >= 1000:
+                        self.main_window.log_message(f"Saved and sorted after {rows_processed_count} rows")
+                        rows_processed_count = 0
+
+                # Small delay between batches (with a single key the requests are sequential)
+                if workers == 1 and batch_num < total_batches and self.is_running:
+                    self.main_window.log_message(f"Waiting 2 seconds before next batch...")
+                    time.sleep(2)
 
+        # Final save
+        if existing_results:
+            results_list = list(existing_results.values())
+            if unsaved:
+                PromptHelper.write_results_csv(existing_results, output_file)
+
+            # Final count
+            completed_count = sum(1 for r in results_list if r.get('edit') and str(r.get('edit')).strip())
+            failed_count = len(results_list) - completed_count
+
+            self.main_window.log_message(f"Translation completed!")
+            self.main_window.log_message(f"Total rows in output: {len(results_list)}")
+            self.main_window.log_message(f"Successful: {completed_count} rows")
+            self.main_window.log_message(f"Failed/Empty: {failed_count} rows")
+            self.main_window.log_message(f"Output saved to: {output_file}")
+
+
+    @staticmethod
+    def _group_repeated_texts(ids_to_process, id_to_text, translation_cache):
+        """Split ids so each distinct text is sent to the API once.
+
+        Returns (send_ids, reused, followers): the ids to send, {id: translation} for texts
+        found in translation_cache, and {sent id: [later ids with the same text]}.
+        """
+        send_ids = []
+        reused = {}
+        followers = {}
+        first_ids = {}
+        for row_id in ids_to_process:
+            text = id_to_text.get(row_id)
+            # Blank or non-text cells are left alone
+            if not isinstance(text, str) or not text.strip():
+                send_ids.append(row_id)
+            elif text in translation_cache:
+                reused[row_id] = translation_cache[text]
+            elif text in first_ids:
+                followers.setdefault(first_ids[text], []).append(row_id)
+            else:
+                first_ids[text] = row_id
+                send_ids.append(row_id)
+        return send_ids, reused, followers
+
+    def _iter_batches(self, ids_to_process, id_to_text, batch_size, total_batches, prompt_template):
+        """Yield (batch_num, ids, texts, prompt) for each batch that has input rows"""
+        for batch_num in range(1, total_batches + 1):
             # Get batch of IDs
             batch_start_idx = (batch_num - 1) * batch_size
             batch_end_idx = min(batch_start_idx + batch_size, len(ids_to_process))
             batch_ids = ids_to_process[batch_start_idx:batch_end_idx]
 
-            # Get actual data for these specific IDs only
-            batch_df = df[df['id'].isin(batch_ids)].sort_values('id')
+            # Get actual data for these specific IDs only (ids_to_process is sorted)
+            actual_batch_ids = [row_id for row_id in batch_ids if row_id in id_to_text]
+            batch_texts = [id_to_text[row_id] for row_id in actual_batch_ids]
+            batch_len = len(actual_batch_ids)
 
-            if len(batch_df) != len(batch_ids):
-                self.main_window.log_message(f"Warning: Expected {len(batch_ids)} rows but found {len(batch_df)}")
+            if batch_len != len(batch_ids):
+                self.main_window.log_message(f"Warning: Expected {len(batch_ids)} rows but found {batch_len}")
                 # Some IDs might not have data in input file
-                missing_in_input = set(batch_ids) - set(batch_df['id'].tolist())
+                missing_in_input = set(batch_ids) - set(actual_batch_ids)
                 if missing_in_input:
                     self.main_window.log_message(f"  IDs not found in input: {sorted(missing_in_input)}")
 
-            if len(batch_df) == 0:
+            if batch_len == 0:
                 self.main_window.log_message(f"Skipping batch {batch_num} - no data found for IDs: {batch_ids}")
                 continue
 
-            actual_batch_ids = batch_df['id'].tolist()
-            self.main_window.log_message(f"Processing batch {batch_num}/{total_batches} (IDs: {min(actual_batch_ids)}-{max(actual_batch_ids)}, {len(batch_df)} rows)")
+            self.main_window.log_message(f"Processing batch {batch_num}/{total_batches} (IDs: {actual_batch_ids[0]}-{actual_batch_ids[-1]}, {batch_len} rows)")
 
             # Create batch text
-            batch_lines = []
-            for j, (_, row) in enumerate(batch_df.iterrows(), 1):
-                batch_lines.append(f"{j}. {row['text']}")
-            batch_text = "\n".join(batch_lines)
+            batch_text = "\n".join(f"{j}. {text}" for j, text in enumerate(batch_texts, 1))
 
             # Format prompt with actual values
-            count_info = f"Nội dung bao gồm {len(batch_df)} dòng có đánh số từ 1 đến {len(batch_df)}."
+            count_info = f"Nội dung bao gồm {batch_len} dòng có đánh số từ 1 đến {batch_len}."
             prompt = prompt_template.format(count_info=count_info, text=batch_text)
 
-            # Call appropriate API
-            translated_text = None
-            error_msg = None
-
-            if ai_service == "Gemini API":
-                translated_text, error_msg = self.api_handler.call_gemini_api(prompt, model_name, api_config, self.current_api_keys)
-            elif ai_service == "ChatGPT API":
-                translated_text, error_msg = self.api_handler.call_openai_api(prompt, model_name, api_config, self.current_api_keys)
-            elif ai_service == "Claude API":
-                translated_text, error_msg = self.api_handler.call_claude_api(prompt, model_name, api_config, self.current_api_keys)
-            elif ai_service == "Grok API":
-                translated_text, error_msg = self.api_handler.call_grok_api(prompt, model_name, api_config, self.current_api_keys)
-
-            if translated_text:
-                # Parse translated text
-                translations = self.parse_numbered_text(translated_text, len(batch_df))
-                successful_count = sum(1 for t in translations if t)
-                self.main_window.log_message(f"Batch {batch_num} completed: {successful_count}/{len(batch_df)} translations successful")
-
-                # Update results
-                for (idx, row), translation in zip(batch_df.iterrows(), translations):
-                    existing_results[row['id']] = {
-                        'id': row['id'],
-                        'raw': row['text'],
-                        'edit': translation,
-                        'status': '' if translation else 'failed'
-                    }
-            else:
-                # Mark batch as failed
-                self.main_window.log_message(f"Batch {batch_num} failed: {error_msg}")
-                for idx, row in batch_df.iterrows():
-                    existing_results[row['id']] = {
-                        'id': row['id'],
-                        'raw': row['text'],
-                        'edit': '',
-                        'status': 'failed'
-                    }
-
-            rows_processed_count += len(batch_df)
-
-            # Save and sort periodically
-            if rows_processed_count >= 1000 or batch_num == total_batches:
-                results_list = list(existing_results.values())
-                results_df = pd.DataFrame(results_list)
-                results_df_sorted = results_df.sort_values('id')
-                results_df_sorted.to_csv(output_file, index=False)
-                self.update_progress()
-
-                if rows_processed_count >= 1000:
-                    self.main_window.log_message(f"Saved and sorted after {rows_processed_count} rows")
-                    rows_processed_count = 0
-
-            # Small delay between batches
-            if batch_num < total_batches and self.is_running:
-                self.main_window.log_message(f"Waiting 2 seconds before next batch...")
-                time.sleep(2)
+            yield batch_num, actual_batch_ids, batch_texts, prompt
 
-        # Final save
-        if existing_results:
-            results_list = list(existing_results.values())
-            results_df = pd.DataFrame(results_list)
-            results_df_sorted = results_df.sort_values('id')
-            results_df_sorted.to_csv(output_file, index=False)
+    def _keys_for_batch(self, batch_num):
+        """Single API key for a batch, round-robin over keys not marked as failed"""
+        available_keys = [key for key in self.current_api_keys if key not in self.api_handler.failed_keys]
+        if not available_keys:
+            # Let the API handler report that no keys are left
+            return self.current_api_keys
+        return [available_keys[batch_num % len(available_keys)]]
 
-            # Final count
-            completed_count = sum(1 for r in results_list if r.get('edit') and str(r.get('edit')).strip())
-            failed_count = len(results_list) - completed_count
-
-            self.main_window.log_message(f"Translation completed!")
-            self.main_window.log_message(f"Total rows in output: {len(results_list)}")
-            self.main_window.log_message(f"Successful: {completed_count} rows")
-            self.main_window.log_message(f"Failed/Empty: {failed_count} rows")
-            self.main_window.log_message(f"Output saved to: {output_file}")
+    def _call_api_with_backoff(self, batch_num, ai_service, prompt, model_name, api_config):
+        """Call the API on the batch's key, retrying a 429 with a doubling delay
 
+        A key still rate limited after the retries is dropped for the rest of the run
+        and the batch moves on to another available key.
+        """
+        while True:
+            api_keys = self._keys_for_batch(batch_num)
+            delay = 2
+            for attempt in range(_RATE_LIMIT_RETRIES + 1):
+                translated_text, error_msg = self._call_api(ai_service, prompt, model_name, api_config, api_keys)
+                if translated_text or not self.api_handler.is_rate_limited(error_msg) or not self.is_running:
+                    return translated_text, error_msg
+                if attempt < _RATE_LIMIT_RETRIES:
+                    self.main_window.log_message(f"Rate limited, retrying batch {batch_num} in {delay} seconds...")
+                    time.sleep(delay)
+                    delay *= 2
+
+            # _keys_for_batch returns a single key while any is still available
+            if len(api_keys) != 1:
+                return translated_text, error_msg
+            if api_keys[0] not in self.api_handler.failed_keys:
+                self.api_handler.disable_key(api_keys[0])
+            if all(key in self.api_handler.failed_keys for key in self.current_api_keys):
+                return translated_text, error_msg
+            self.main_window.log_message(f"Moving batch {batch_num} to another API key")
+
+    def _call_api(self, ai_service, prompt, model_name, api_config, api_keys):
+        """Call the API for ai_service; returns (translated_text, error_msg)"""
+        if ai_service == "Gemini API":
+            return self.api_handler.call_gemini_api(prompt, model_name, api_config, api_keys)
+        elif ai_service == "ChatGPT API":
+            return self.api_handler.call_openai_api(prompt, model_name, api_config, api_keys)
+        elif ai_service == "Claude API":
+            return self.api_handler.call_claude_api(prompt, model_name, api_config, api_keys)
+        elif ai_service == "Grok API":
+            return self.api_handler.call_grok_api(prompt, model_name, api_config, api_keys)
+        return None, None
 
     @staticmethod
     def parse_numbered_text(text, expected_count):
         """Parse numbered text into list of translations"""
-        lines = []
+        # Drop \r from the whole response once instead of from every parsed line
+        text = text.replace('\r', '')
 
-        # Find all numbered lines with pattern "number. text"
-        pattern = r'(\d+)\.\s*(.*?)(?=\n\d+\.|$)'
-        matches = re.findall(pattern, text, re.DOTALL)
+        # Slot per expected line; None marks a line not present in the response
+        lines = [None] * expected_count
+        matched = False
 
-        if matches:
-            # Create dictionary with line number as key
-            numbered_lines = {}
-            for num, content in matches:
-                line_num = int(num)
-                if 1 <= line_num <= expected_count:
-                    # Clean up the content - remove \r if present
-                    content = content.strip().replace('\r', '')
+        # Find all numbered lines with pattern "number. text"
+        for number, content in TranslationProcessor._iter_numbered_lines(text):
+            matched = True
+            line_num = int(number)
+            if 1 <= line_num <= expected_count:
+                content = content.strip()
 
-                    # Special handling for the last line in batch
-                    if line_num == expected_count:
-                        content = TranslationProcessor.clean_last_line_content(content)
+                # Special handling for the last line in batch
+                if line_num == expected_count:
+                    content = TranslationProcessor.clean_last_line_content(content)
 
-                    numbered_lines[line_num] = content
+                lines[line_num - 1] = content
 
+        if matched:
             # Check if line 1 is missing but line 2 exists
-            if 1 not in numbered_lines and 2 in numbered_lines:
+            if expected_count >= 2 and lines[0] is None and lines[1] is not None:
                 # Extract text before "2." as content for line 1
-                pre_match = re.search(r'^(.*?)(?=\n?2\.)', text, re.DOTALL)
-                if pre_match:
-                    pre_text = pre_match.group(1).strip().replace('\r', '')
-                    if pre_text and not re.match(r'^\d+\.', pre_text):
-                        numbered_lines[1] = pre_text
-
-            # Fill in all lines in order
-            for i in range(1, expected_count + 1):
-                if i in numbered_lines:
-                    lines.append(numbered_lines[i])
-                else:
-                    lines.append("")  # Missing line
-        else:
-            # Fallback: split by newline and clean
-            text_lines = text.strip().split('\n')
-            for i, line in enumerate(text_lines[:expected_count]):
-                # Remove line numbers if present and \r characters
-                cleaned = re.sub(r'^\d+\.\s*', '', line).strip().replace('\r', '')
+                line_2_pos = text.find('2.')
+                if line_2_pos != -1:
+                    pre_text = text[:line_2_pos].strip()
+                    if pre_text and not _LEADING_NUMBER_RE.match(pre_text):
+                        lines[0] = pre_text
 
-                # Special handling for the last line in fallback mode
-                if i == expected_count - 1:  # Last line (0-indexed)
-                    cleaned = TranslationProcessor.clean_last_line_content(cleaned)
+            # Missing lines become empty strings
+            return [line if line is not None else "" for line in lines]
 
-                lines.append(cleaned)
+        # Fallback: split by newline and clean
+        lines = []
+        text_lines = text.strip().split('\n')
+        for i, line in enumerate(text_lines[:expected_count]):
+            # Remove line numbers if present
+            cleaned = _LEADING_NUMBER_RE.sub('', line, count=1).strip()
 
-            # Pad with empty strings if needed
-            while len(lines) < expected_count:
-                lines.append("")
+            # Special handling for the last line in fallback mode
+            if i == expected_count - 1:  # Last line (0-indexed)
+                cleaned = TranslationProcessor.clean_last_line_content(cleaned)
+
+            lines.append(cleaned)
+
+        # Pad with empty strings if needed
+        lines.extend([""] * (expected_count - len(lines)))
 
         return lines
 
+    @staticmethod
+    def _iter_numbered_lines(text):
+        """Yield (number, content) for each "number. content" entry of a response.
+
+        An entry runs from its number to the next line that starts with a number and a dot.
+        """
+        pos = 0
+        while True:
+            match = _NUMBER_RE.search(text, pos)
+            if not match:
+                return
+            next_match = _NEXT_NUMBER_RE.search(text, match.end())
+            pos = next_match.start() if next_match else len(text)
+            yield match.group(1), text[match.end():pos]
+
     @staticmethod
     def clean_last_line_content(content):
         """
@@ -441,22 +630,13 @@ class TranslationProcessor:
 
         # 1. HARD SEPARATORS (Các ký tự phân cách rõ ràng)
         # Nếu tìm thấy các ký tự này, cắt bỏ toàn bộ nội dung phía sau nó.
-        separator_patterns = ['***', '---', '===', '___', '•••']
-
-        for separator in separator_patterns:
+        for separator in _SEPARATOR_PATTERNS:
             if separator in content:
                 # Lấy phần text trước separator đầu tiên tìm thấy
                 return content.split(separator)[0].strip()
 
         # 2. KEYWORD PATTERNS (Các cụm từ bắt đầu câu hỏi/nhận xét của AI)
-        # Kiểm tra dòng cuối cùng có bắt đầu bằng các từ khóa này không.
-        ai_start_phrases = [
-            'bạn muốn', 'bạn có', 'có muốn', 'có hài lòng',
-            'would you', 'do you', 'let me know', 'is there',
-            'có cần', 'nếu bạn', 'hãy cho', 'please',
-            'tôi có thể', 'i can', 'if you', 'feel free'
-        ]
-
+        # Kiểm tra dòng cuối cùng có bắt đầu bằng các từ khóa này không (_AI_START_PHRASES).
         lines = content.split('\n')
         if not lines:
             return content
@@ -470,7 +650,7 @@ class TranslationProcessor:
                 continue
 
             # Nếu dòng cuối cùng (có nội dung) bắt đầu bằng keyword
-            if any(current_line.startswith(phrase) for phrase in ai_start_phrases):
+            if current_line.startswith(_AI_START_PHRASES):
                 # Trả về toàn bộ nội dung TRƯỚC dòng đó
                 return '\n'.join(lines[:i]).strip()
 
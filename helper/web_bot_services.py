@@ -2,7 +2,7 @@ import time
 import pyautogui
 import pyperclip
 import re
-from helper.click_handler import find_and_click, ensure_scroll_to_bottom
+from helper.click_handler import find_and_click, ensure_scroll_to_bottom, screen_size
 from helper.translation_processor import TranslationProcessor
 
 class WebBotServices:
@@ -94,7 +94,8 @@ class WebBotServices:
                 max_attempts=5,
                 delay_between=2.0,
                 confidence=0.85,
-                return_all_coords=True
+                return_all_coords=True,
+                warmup=1.0  # First look after the bot takes over the screen
             )
 
             if not box_coords:
@@ -154,7 +155,7 @@ class WebBotServices:
 
             time.sleep(3)
             # Step 4: Wait for processing to complete
-            screen_width, screen_height = pyautogui.size()
+            screen_width, screen_height = screen_size()
             processing_region = (screen_width/2, screen_height - 200, screen_width*3/4, 200)  # Bottom 200px of screen
 
             is_processing = True
@@ -247,7 +248,7 @@ class WebBotServices:
             self.main_window.log_message(f"Cleaning up {service_name} chat...")
 
             # Find chat option region at top of screen
-            screen_width, _ = pyautogui.size()
+            screen_width, _ = screen_size()
 
             if service_name == "Perplexity":
                 top_region = (screen_width/2, 0, screen_width, 150)
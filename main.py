@@ -1,3 +1,5 @@
+import multiprocessing
+
 from gui.main_window import AITranslationBridgeGUI
 
 
@@ -8,4 +10,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # Required for the converter's process pool in the frozen (PyInstaller) build
+    multiprocessing.freeze_support()
     main()
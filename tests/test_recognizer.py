@@ -0,0 +1,38 @@
+import glob
+import os
+
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+recognizer = pytest.importorskip("helper.recognizer")
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets")
+TEMPLATES = sorted(glob.glob(os.path.join(ASSETS_DIR, "*", "*.png")))
+
+# Offset of the icon on the synthetic screen; each test shifts it by 0-3 px on both axes
+# so every alignment to the 4 px grid of the coarse pass is covered
+BASE_X, BASE_Y = 48, 40
+
+
+def _screen_with(template, dx, dy):
+  """Noisy screen holding a pixel-exact copy of template at (BASE_X + dx, BASE_Y + dy)"""
+  h, w = template.shape[:2]
+  rng = np.random.default_rng(0)
+  screen = rng.integers(0, 256, size=(h + 2 * BASE_Y + 8, w + 2 * BASE_X + 8, 3), dtype=np.uint8)
+  screen[BASE_Y + dy:BASE_Y + dy + h, BASE_X + dx:BASE_X + dx + w] = template
+  return screen
+
+
+def test_assets_present():
+  assert TEMPLATES
+
+
+@pytest.mark.parametrize("template_path", TEMPLATES, ids=lambda p: os.path.relpath(p, ASSETS_DIR))
+def test_asset_found_at_every_grid_alignment(template_path):
+  template = recognizer.load_template(template_path)
+  for dy in range(4):
+    for dx in range(4):
+      screen = _screen_with(template, dx, dy)
+      points = recognizer._match_points(screen, template, 0.85)
+      assert (BASE_X + dx, BASE_Y + dy) in {(x, y) for x, y, _ in points}, (dx, dy)